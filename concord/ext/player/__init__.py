@@ -21,28 +21,48 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+from concord.ext.player.autoplay import AutoplayBuffer
+from concord.ext.player.breaker import CircuitBreaker, NegativeCache
+from concord.ext.player.buffer import BufferedAudioSource, BufferPool
+from concord.ext.player.cache import AudioCache
 from concord.ext.player.entry import Entry, Playlist
 from concord.ext.player.exceptions import (
+    CircuitOpenError,
     EmptyStreamError,
+    ExtractionCancelledError,
+    ExtractionTimeoutError,
     PlayerError,
     PlayerExtensionError,
     UnsupportedURLError,
+    UpstreamError,
 )
 from concord.ext.player.extension import PlayerExtension
 from concord.ext.player.extractor import (
     Extractor,
+    ExtractorChain,
     StreamlinkExtractor,
     YouTubeDLExtractor,
 )
+from concord.ext.player.formats import FormatPolicy
+from concord.ext.player.loudness import LoudnessAnalyzer
 from concord.ext.player.middleware import (
+    Autoplay,
+    Jump,
+    Move,
     Pause,
     Play,
+    Queue,
+    Remove,
     Resume,
+    Shuffle,
     Skip,
+    Stats,
     Stop,
     Volume,
 )
 from concord.ext.player.state import State
+from concord.ext.player.stats import TrackTimeline
+from concord.ext.player.treap import EntryQueue
 from concord.ext.player.version import version
 
 
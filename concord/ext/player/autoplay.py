@@ -0,0 +1,126 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import collections
+import random
+from typing import Optional
+
+from concord.ext.player.entry import Entry, Playlist
+from concord.ext.player.exceptions import PlayerExtensionError
+
+
+class AutoplayBuffer:
+    """Buffer of entries to play, when the playlist is over.
+
+    Buffer is filled in background with entries, related to the played ones
+    (see :meth:`Extractor.related`), or with random entries of the seed
+    playlist, if there's no related entries.
+
+    Args:
+        seed: Playlist to take entries from, if there's no related entries.
+        size: Number of entries to keep in the buffer.
+        history: Number of recently played entries, that shouldn't be repeated.
+
+    Attributes:
+        seed: Playlist to take entries from, if there's no related entries.
+        size: Number of entries to keep in the buffer.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: Optional[Playlist] = None,
+        size: int = 5,
+        history: int = 50,
+    ):
+        self.seed = seed
+        self.size = size
+
+        self._buffer = collections.deque()
+        self._history = collections.deque(maxlen=history)
+        self._task = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def pop(self) -> Optional[Entry]:
+        """Returns the next entry to play, or ``None`` if there's no one."""
+        while self._buffer:
+            entry = self._buffer.popleft()
+            # It could be played after it has been buffered.
+            if entry.key is None or entry.key not in self._history:
+                return entry
+        return None
+
+    def played(self, entry: Entry):
+        """Remembers played entry, so it will not be repeated."""
+        if entry.key is not None:
+            self._history.append(entry.key)
+
+    def refill(self, entry: Entry):
+        """Fills the buffer in background with entries, related to given one.
+
+        Does nothing, if the buffer is full or is being filled.
+        """
+        if len(self._buffer) >= self.size:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.ensure_future(self._refill(entry))
+
+    def close(self):
+        """Stops filling the buffer."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _is_new(self, entry: Entry) -> bool:
+        key = entry.key
+        if key is None:
+            return True
+        return key not in self._history and all(
+            key != queued.key for queued in self._buffer
+        )
+
+    async def _refill(self, entry: Entry):
+        if entry.has_extractor():
+            try:
+                related = await entry.extractor.related(entry)
+            except PlayerExtensionError:
+                related = None
+            #
+            if related is not None:
+                for candidate in related.entries:
+                    if len(self._buffer) >= self.size:
+                        return
+                    if self._is_new(candidate):
+                        self._buffer.append(candidate)
+        #
+        seed = self.seed.entries if self.seed is not None else ()
+        attempts = len(seed)
+        while len(self._buffer) < self.size and attempts > 0:
+            attempts -= 1
+            candidate = seed[random.randrange(len(seed))]
+            if self._is_new(candidate):
+                self._buffer.append(candidate)
@@ -0,0 +1,211 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import collections
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Type
+
+from concord.ext.player.exceptions import (
+    CircuitOpenError,
+    EmptyStreamError,
+    ExtractionTimeoutError,
+    PlayerExtensionError,
+    UnsupportedURLError,
+    UpstreamError,
+)
+
+
+class NegativeCache:
+    """Cache of recent failures.
+
+    Remembers errors of failed urls for a short time, so the same url is not
+    retried while it's known to fail. Errors, that are not caused by the url
+    itself (timeouts, upstream failures), are not remembered.
+
+    Args:
+        ttls: Map exception type -> time in seconds to remember errors of this
+            type for. Subclasses are looked up by the closest base class.
+        max_size: Maximum number of remembered failures.
+
+    Attributes:
+        ttls: Map exception type -> time in seconds to remember errors of this
+            type for.
+        max_size: Maximum number of remembered failures.
+    """
+
+    TTLS = {
+        UnsupportedURLError: 300.0,
+        EmptyStreamError: 60.0,
+        PlayerExtensionError: 30.0,
+        ExtractionTimeoutError: None,
+        UpstreamError: None,
+        CircuitOpenError: None,
+    }
+
+    def __init__(
+        self,
+        *,
+        ttls: Optional[Dict[Type[Exception], Optional[float]]] = None,
+        max_size: int = 10000,
+    ):
+        self.ttls = self.TTLS if ttls is None else ttls
+        self.max_size = max_size
+        self._failures = collections.OrderedDict()
+
+    def check(self, key: Hashable):
+        """Raises remembered error for given key, if there's one."""
+        failure = self._failures.get(key)
+        if failure is None:
+            return
+        #
+        error, expires_at = failure
+        if expires_at <= time.monotonic():
+            del self._failures[key]
+            return
+        raise error()
+
+    def add(self, key: Hashable, error: Exception):
+        """Remembers the error for given key."""
+        ttl = None
+        for cls in type(error).__mro__:
+            if cls in self.ttls:
+                ttl = self.ttls[cls]
+                break
+        if ttl is None:
+            return
+        #
+        self._failures.pop(key, None)
+        self._failures[key] = (type(error), time.monotonic() + ttl)
+        if len(self._failures) > self.max_size:
+            self._failures.popitem(last=False)
+
+
+class CircuitBreaker:
+    """Circuit breaker for calls to an upstream.
+
+    If the rate of failed calls among recent ones crosses the threshold, the
+    circuit opens and calls fail fast with :class:`CircuitOpenError`. After
+    ``cooldown`` seconds the circuit is half-open: the next call is let through
+    as a probe, while others still fail fast. If the probe doesn't fail due to
+    the upstream, the circuit closes, otherwise it opens again.
+
+    Only errors of the upstream's health count as failures, errors of
+    requested urls (unsupported, removed, private, etc) don't.
+
+    Args:
+        threshold: Rate of failed calls (from 0.0 to 1.0) to open the circuit.
+        window: Number of recent calls to compute the rate by.
+        min_calls: Minimum number of recent calls to compute the rate.
+        cooldown: Time in seconds after which the circuit is half-open.
+
+    Attributes:
+        FAILURES: Exceptions considered as upstream failures. Other errors are
+            considered as successful calls.
+        threshold: Rate of failed calls to open the circuit.
+        min_calls: Minimum number of recent calls to compute the rate.
+        cooldown: Time in seconds after which the circuit is half-open.
+    """
+
+    FAILURES = (ExtractionTimeoutError, UpstreamError)
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        cooldown: float = 30.0,
+    ):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+
+        self._results = collections.deque(maxlen=window)
+        self._opened_at = None
+        self._is_probing = False
+
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def _is_failure(self, error: BaseException) -> bool:
+        return isinstance(error, self.FAILURES)
+
+    async def call(self, fn: Callable[[], Awaitable]):
+        """Calls given coroutine function, if the circuit is closed (or the
+        call is a probe of the half-open circuit).
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        is_probe = self._enter()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            if is_probe:
+                self._is_probing = False
+            raise
+        except Exception as error:
+            self._record(not self._is_failure(error), is_probe)
+            raise
+        self._record(True, is_probe)
+        return result
+
+    def _enter(self) -> bool:
+        """Checks the circuit before a call.
+
+        Returns:
+            ``True``, if the call is a probe of the half-open circuit.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        if not self.is_open():
+            return False
+        if self._is_probing:
+            raise CircuitOpenError()
+        if time.monotonic() - self._opened_at < self.cooldown:
+            raise CircuitOpenError()
+        #
+        self._is_probing = True
+        return True
+
+    def _record(self, success: bool, is_probe: bool):
+        if is_probe:
+            self._is_probing = False
+            if success:
+                self._results.clear()
+                self._opened_at = None
+            else:
+                self._opened_at = time.monotonic()
+            return
+        # Results of calls started before the circuit has opened are ignored.
+        if self.is_open():
+            return
+        #
+        self._results.append(success)
+        if len(self._results) < self.min_calls:
+            return
+        failures = self._results.count(False)
+        if failures / len(self._results) >= self.threshold:
+            self._opened_at = time.monotonic()
@@ -0,0 +1,204 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import threading
+from typing import Optional
+
+import discord
+
+
+class BufferPool:
+    """Memory budget for read-ahead buffers, shared by all players.
+
+    Args:
+        read_ahead: Duration of audio to read ahead per track, in seconds.
+        max_size: Maximum total size of all buffers, in bytes.
+        min_read_ahead: Minimum duration of a buffer, in seconds. If the
+            budget is exhausted, audio isn't buffered at all.
+
+    Attributes:
+        FRAME_LENGTH: Duration of a frame, in seconds.
+        FRAME_SIZE: Size of a frame of 16-bit 48KHz stereo PCM, in bytes.
+        read_ahead: Duration of audio to read ahead per track, in seconds.
+        max_size: Maximum total size of all buffers, in bytes.
+        min_read_ahead: Minimum duration of a buffer, in seconds.
+    """
+
+    FRAME_LENGTH = 0.02
+    FRAME_SIZE = 3840
+
+    def __init__(
+        self,
+        *,
+        read_ahead: float = 3.0,
+        max_size: int = 64 << 20,
+        min_read_ahead: float = 0.2,
+    ):
+        self.read_ahead = read_ahead
+        self.max_size = max_size
+        self.min_read_ahead = min_read_ahead
+
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Total size of allocated buffers, in bytes."""
+        return self._size
+
+    def wrap(self, source: discord.AudioSource) -> discord.AudioSource:
+        """Returns buffered audio source, reading ahead from given one.
+
+        If the budget is exhausted, given source is returned as is.
+        """
+        frames = self._acquire(
+            int(self.read_ahead / self.FRAME_LENGTH),
+            int(self.min_read_ahead / self.FRAME_LENGTH),
+        )
+        if frames == 0:
+            return source
+        return BufferedAudioSource(source, frames=frames, pool=self)
+
+    def _acquire(self, frames: int, min_frames: int) -> int:
+        with self._lock:
+            available = (self.max_size - self._size) // self.FRAME_SIZE
+            frames = min(frames, available)
+            if frames < max(min_frames, 1):
+                return 0
+            self._size += frames * self.FRAME_SIZE
+            return frames
+
+    def release(self, frames: int):
+        """Returns memory of a buffer with given number of frames."""
+        with self._lock:
+            self._size -= frames * self.FRAME_SIZE
+
+
+class BufferedAudioSource(discord.AudioSource):
+    """Audio source, that reads ahead from the original one.
+
+    Frames are read from the original audio (usually, FFmpeg's pipe) by a
+    separate thread into a preallocated ring buffer, so reading never blocks on
+    I/O. While the buffer is empty, silence is returned.
+
+    Args:
+        original: The original audio source.
+        frames: Capacity of the buffer, in frames.
+        pool: Pool the buffer's memory is acquired from, to be released on
+            cleanup.
+
+    Attributes:
+        FRAME_SIZE: Size of a frame of 16-bit 48KHz stereo PCM, in bytes.
+        SILENCE: Frame of silence.
+        original: The original audio source.
+        silent: Has the last read returned silence.
+        underruns: Number of reads, that have returned silence after the
+            playback has started.
+    """
+
+    FRAME_SIZE = BufferPool.FRAME_SIZE
+    SILENCE = bytes(FRAME_SIZE)
+
+    def __init__(
+        self,
+        original: discord.AudioSource,
+        *,
+        frames: int,
+        pool: Optional[BufferPool] = None,
+    ):
+        self.original = original
+        self.silent = False
+        self.underruns = 0
+
+        self._pool = pool
+        self._capacity = frames
+        self._ring = memoryview(bytearray(frames * self.FRAME_SIZE))
+        self._head = 0
+        self._count = 0
+        self._is_started = False
+        self._is_eof = False
+        self._is_closed = False
+        self._condition = threading.Condition()
+
+        self._reader = threading.Thread(
+            target=self._fill, name="player-buffer", daemon=True
+        )
+        self._reader.start()
+
+    def _fill(self):
+        try:
+            while True:
+                with self._condition:
+                    while self._count == self._capacity and not self._is_closed:
+                        self._condition.wait()
+                    if self._is_closed:
+                        return
+                    tail = (self._head + self._count) % self._capacity
+                # The slot is not visible to the reader until it is counted,
+                # so it is filled without the lock.
+                data = self.original.read()
+                if len(data) != self.FRAME_SIZE:
+                    return
+                offset = tail * self.FRAME_SIZE
+                self._ring[offset : offset + self.FRAME_SIZE] = data
+                with self._condition:
+                    self._count += 1
+        except Exception:
+            # Pipe is broken (e.g. FFmpeg is killed), that's the end.
+            pass
+        finally:
+            with self._condition:
+                self._is_eof = True
+
+    def read(self) -> bytes:  # noqa: D102
+        with self._condition:
+            if self._count == 0:
+                if self._is_eof or self._is_closed:
+                    return b""
+                self.silent = True
+                if self._is_started:
+                    self.underruns += 1
+                return self.SILENCE
+            #
+            offset = self._head * self.FRAME_SIZE
+            data = bytes(self._ring[offset : offset + self.FRAME_SIZE])
+            self._head = (self._head + 1) % self._capacity
+            self._count -= 1
+            self._condition.notify()
+        self.silent = False
+        self._is_started = True
+        return data
+
+    def is_opus(self) -> bool:  # noqa: D102
+        return False
+
+    def cleanup(self):  # noqa: D102
+        with self._condition:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            self._condition.notify()
+        # Reader is unblocked by killing the original's process.
+        self.original.cleanup()
+        if self._pool is not None:
+            self._pool.release(self._capacity)
@@ -0,0 +1,238 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import collections
+import hashlib
+import os
+import shlex
+import tempfile
+from typing import Optional
+
+
+class AudioCache:
+    """Disk cache of transcoded audio for frequently played tracks.
+
+    Tracks are counted on every play and, once the play count reaches the
+    threshold, transcoded by FFmpeg into an Opus file in the background. Files
+    are written into a temporary file first and moved into place atomically,
+    so a partially written file is never served. Total size of cached files is
+    bounded, least recently played files are evicted first.
+
+    Args:
+        path: Directory to keep cached files in. Will be created, if missing.
+        max_size: Maximum total size of cached files, in bytes.
+        threshold: Play count after which a track should be cached.
+        bitrate: Bitrate of cached audio, as FFmpeg understands it.
+        max_jobs: Maximum number of concurrent transcoding jobs.
+
+    Attributes:
+        path: Directory with cached files.
+        max_size: Maximum total size of cached files, in bytes.
+        threshold: Play count after which a track should be cached.
+        bitrate: Bitrate of cached audio.
+        max_jobs: Maximum number of concurrent transcoding jobs.
+    """
+
+    SUFFIX = ".opus"
+    TEMP_SUFFIX = ".tmp"
+    MAX_COUNTED = 65536
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_size: int = 1 << 30,
+        threshold: int = 3,
+        bitrate: str = "96k",
+        max_jobs: int = 2,
+    ):
+        self.path = path
+        self.max_size = max_size
+        self.threshold = threshold
+        self.bitrate = bitrate
+        self.max_jobs = max_jobs
+
+        self._files = collections.OrderedDict()
+        self._size = 0
+        self._plays = collections.OrderedDict()
+        self._pending = set()
+        self._jobs = None
+
+        os.makedirs(path, exist_ok=True)
+        self._scan()
+
+    @property
+    def size(self) -> int:
+        """Total size of cached files, in bytes."""
+        return self._size
+
+    def _filename(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, digest + self.SUFFIX)
+
+    def _scan(self):
+        files = []
+
+        for name in os.listdir(self.path):
+            filename = os.path.join(self.path, name)
+            # Leftovers of interrupted transcoding.
+            if name.endswith(self.TEMP_SUFFIX):
+                os.remove(filename)
+                continue
+            if not name.endswith(self.SUFFIX):
+                continue
+            #
+            stat = os.stat(filename)
+            files.append((stat.st_mtime, filename, stat.st_size))
+        #
+        for _, filename, size in sorted(files):
+            self._files[filename] = size
+            self._size += size
+        self._evict()
+
+    def _evict(self):
+        while self._size > self.max_size and self._files:
+            filename, size = self._files.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns path to the cached file of the track.
+
+        Args:
+            key: The track identity.
+
+        Returns:
+            Path to the file, or ``None``, if the track isn't cached.
+        """
+        filename = self._filename(key)
+        if filename not in self._files:
+            return None
+        #
+        self._files.move_to_end(filename)
+        try:
+            # Modification time keeps LRU order between restarts.
+            os.utime(filename)
+        except FileNotFoundError:
+            self._size -= self._files.pop(filename)
+            return None
+        return filename
+
+    def count_play(self, key: str) -> bool:
+        """Counts a play of the track.
+
+        Args:
+            key: The track identity.
+
+        Returns:
+            ``True``, if the track should be stored into the cache.
+        """
+        plays = self._plays.pop(key, 0) + 1
+        self._plays[key] = plays
+        if len(self._plays) > self.MAX_COUNTED:
+            self._plays.popitem(last=False)
+
+        return (
+            plays >= self.threshold
+            and key not in self._pending
+            and self._filename(key) not in self._files
+        )
+
+    async def store(
+        self, key: str, url: str, *, before_options: str = ""
+    ) -> bool:
+        """Transcodes the audio by given url and stores it into the cache.
+
+        Args:
+            key: The track identity.
+            url: The stream url of the track.
+            before_options: FFmpeg input options for the stream.
+
+        Returns:
+            ``True``, if the track has been stored.
+        """
+        if key in self._pending:
+            return False
+        if self._jobs is None:
+            self._jobs = asyncio.Semaphore(self.max_jobs)
+        #
+        self._pending.add(key)
+        try:
+            async with self._jobs:
+                return await self._transcode(key, url, before_options)
+        finally:
+            self._pending.discard(key)
+
+    async def _transcode(self, key: str, url: str, before_options: str) -> bool:
+        fd, temp = tempfile.mkstemp(suffix=self.TEMP_SUFFIX, dir=self.path)
+        os.close(fd)
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-y",
+                *shlex.split(before_options),
+                "-i",
+                url,
+                "-vn",
+                "-c:a",
+                "libopus",
+                "-b:a",
+                self.bitrate,
+                "-f",
+                "ogg",
+                temp,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            try:
+                code = await process.wait()
+            except asyncio.CancelledError:
+                process.kill()
+                raise
+            #
+            size = os.path.getsize(temp)
+            if code != 0 or size == 0:
+                return False
+
+            filename = self._filename(key)
+            os.replace(temp, filename)
+        except OSError:
+            return False
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+        #
+        if filename in self._files:
+            self._size -= self._files[filename]
+        self._files[filename] = size
+        self._size += size
+        self._evict()
+        return True
@@ -22,9 +22,21 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import asyncio
-from typing import Dict, Optional
+import collections
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Sequence
 
-from concord.ext.player.exceptions import PlayerExtensionError
+from concord.ext.player.exceptions import (
+    ExtractionTimeoutError,
+    PlayerExtensionError,
+    UpstreamError,
+)
+from concord.ext.player.formats import FormatPolicy
+from concord.ext.player.treap import EntryQueue
+
+
+log = logging.getLogger(__name__)
 
 
 class Entry:
@@ -36,6 +48,9 @@ class Entry:
     ):
         self.source_url = source_url
         self.extractor = extractor
+        # Chosen format (format_id, acodec, abr, asr) of the last resolved
+        # stream, if extractor supports format selection.
+        self.stream_format: Optional[Dict] = None
 
     def is_source(self) -> bool:
         return self.source_url is not None
@@ -43,9 +58,43 @@ class Entry:
     def has_extractor(self) -> bool:
         return self.extractor is not None
 
-    def resolve(self, loop: asyncio.AbstractEventLoop) -> str:
+    @property
+    def key(self) -> Optional[str]:
+        """Stable identity of the track, or ``None`` if there's no one."""
+        return None
+
+    @property
+    def title(self) -> str:
+        """Human-readable name of the track."""
+        return self.source_url or "Unknown"
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duration of the track in seconds, or ``None`` if it's unknown."""
+        return None
+
+    @property
+    def page_url(self) -> Optional[str]:
+        """Url of the track's page, by which it can be extracted again (with
+        another extractor), or ``None`` if there's no one."""
+        return self.source_url
+
+    def ffmpeg_before_options(self) -> str:
+        """Returns FFmpeg input options for the track's stream."""
+        if self.has_extractor():
+            return self.extractor.ffmpeg_before_options()
+        return ""
+
+    async def resolve(
+        self,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
+    ) -> str:
         if self.has_extractor():
-            return self.extractor.resolve(self, loop)
+            return await self.extractor.resolve(
+                self, timeout=timeout, policy=policy
+            )
         raise PlayerExtensionError("Extractor not found")
 
 
@@ -70,11 +119,191 @@ class YouTubeDLEntry(Entry):
         super().__init__(source_url=source_url, extractor=extractor)
         self.metadata = metadata
 
+    @property
+    def key(self) -> Optional[str]:  # noqa: D102
+        if self.metadata.get("is_live") or "id" not in self.metadata:
+            return None
+        #
+        extractor = self.metadata.get("extractor_key") or self.metadata.get(
+            "ie_key", "generic"
+        )
+        if extractor.lower() != "generic":
+            return f"{extractor}:{self.metadata['id']}"
+        # Ids of the generic extractor are just file names, not unique.
+        url = self.page_url
+        if url is None:
+            return None
+        return f"{extractor}:{hashlib.sha1(url.encode()).hexdigest()}"
+
+    @property
+    def title(self) -> str:  # noqa: D102
+        return self.metadata.get("title") or super().title
+
+    @property
+    def duration(self) -> Optional[float]:  # noqa: D102
+        if self.metadata.get("is_live"):
+            return None
+        return self.metadata.get("duration")
+
+    @property
+    def page_url(self) -> Optional[str]:  # noqa: D102
+        url = self.metadata.get("webpage_url") or self.source_url
+        if url is None:
+            # Url of a not processed entry can be just an id.
+            url = self.metadata.get("url")
+            if url is None or "://" not in url:
+                return None
+        return url
+
 
 class Playlist:
-    def __init__(self, *, source_url: Optional[str] = None):
+    """Playlist of entries.
+
+    Playlist can be lazy: only first pages of a huge playlist are loaded, the
+    rest is loaded with :attr:`loaders`, when needed. Entries can be stored in
+    a compact raw form, see :class:`EntryQueue`.
+
+    Args:
+        source_url: The url playlist is extracted from.
+        loader: Coroutine function, that loads the next page of entries and
+            returns them (as a sequence or :class:`EntryQueue`), or returns
+            empty sequence, if there's nothing to load.
+
+    Attributes:
+        PREFETCH_DISTANCE: Number of not played entries, after which the next
+            page should be loaded.
+        MAX_RETRIES: Maximum number of attempts to load a page again, if the
+            upstream is unavailable (timeouts, upstream errors).
+        RETRY_DELAY: Delay before the first retry, in seconds. Grows linearly
+            with the attempts.
+        source_url: The url playlist is extracted from.
+        entries: Loaded entries.
+        loaders: Loaders of not loaded pages. Pages are loaded from the first
+            loader until it is exhausted.
+    """
+
+    PREFETCH_DISTANCE = 5
+    MAX_RETRIES = 3
+    RETRY_DELAY = 1.0
+
+    def __init__(
+        self,
+        *,
+        source_url: Optional[str] = None,
+        loader: Optional[Callable[[], Awaitable[Sequence]]] = None,
+    ):
         self.source_url = source_url
-        self.entries = []
+        self.entries = EntryQueue()
+        self.loaders = collections.deque()
+        self._loading = None
+        self._failures = 0
+
+        if loader is not None:
+            self.loaders.append(loader)
 
     def is_source(self) -> bool:
         return self.source_url is not None
+
+    def is_complete(self) -> bool:
+        """Returns ``True``, if there's nothing to load."""
+        return not self.loaders
+
+    def extend(self, playlist: "Playlist"):
+        """Moves entries (and not loaded pages) of other playlist to the end.
+
+        Not loaded pages of both playlists will be appended to the end, when
+        loaded. If this playlist is not complete, entries of other playlist are
+        appended after this playlist's pages are loaded, to keep the order.
+        """
+        if self.is_complete():
+            self.entries.extend(playlist.entries)
+        elif len(playlist.entries) > 0:
+            segment = EntryQueue()
+            segment.extend(playlist.entries)
+            self.loaders.append(self._segment_loader(segment))
+        #
+        self.loaders.extend(playlist.loaders)
+        playlist.loaders.clear()
+
+    @staticmethod
+    def _segment_loader(
+        segment: EntryQueue
+    ) -> Callable[[], Awaitable[Optional[EntryQueue]]]:
+        """Returns loader of already loaded entries, that returns them once."""
+        entries = [segment]
+
+        async def load() -> Optional[EntryQueue]:
+            return entries.pop() if entries else None
+
+        return load
+
+    async def ensure(self, index: int):
+        """Loads pages until the entry by given index is loaded.
+
+        Does nothing, if the playlist is complete.
+        """
+        while len(self.entries) <= index and not self.is_complete():
+            if self._loading is None:
+                self._loading = asyncio.ensure_future(self._load())
+            loading = self._loading
+            try:
+                # Loading is shared, it shouldn't be cancelled with the waiter.
+                await asyncio.shield(loading)
+            finally:
+                if self._loading is loading and loading.done():
+                    self._loading = None
+
+    def prefetch(self, index: int):
+        """Loads the next page in background, if the entry by given index is
+        close to the end of loaded entries."""
+        if self.is_complete() or self._loading is not None:
+            return
+        if len(self.entries) - index > self.PREFETCH_DISTANCE:
+            return
+        #
+        self._loading = asyncio.ensure_future(self._load())
+        self._loading.add_done_callback(self._on_prefetched)
+
+    def _on_prefetched(self, loading: asyncio.Future):
+        if self._loading is loading:
+            self._loading = None
+        # Nobody waits for the prefetch, so the error is just retrieved.
+        if not loading.cancelled():
+            loading.exception()
+
+    async def _load(self):
+        loader = self.loaders[0]
+        try:
+            entries = await loader()
+        except (ExtractionTimeoutError, UpstreamError):
+            self._failures += 1
+            if self._failures <= self.MAX_RETRIES:
+                # Upstream is temporarily unavailable, loader is retried.
+                await asyncio.sleep(self.RETRY_DELAY * self._failures)
+                return
+            log.warning(
+                "Playlist %s is truncated at %d entries: upstream is "
+                "unavailable",
+                self.source_url,
+                len(self.entries),
+            )
+            entries = None
+        except PlayerExtensionError:
+            log.warning(
+                "Playlist %s is truncated at %d entries: page can't be loaded",
+                self.source_url,
+                len(self.entries),
+            )
+            entries = None
+        self._failures = 0
+        # Loader is exhausted or broken, don't try it again.
+        if not entries:
+            if self.loaders and self.loaders[0] is loader:
+                self.loaders.popleft()
+            return
+        #
+        if isinstance(entries, EntryQueue):
+            self.entries.extend(entries)
+            return
+        for entry in entries:
+            self.entries.append(entry)
@@ -40,3 +40,21 @@ class EmptyStreamError(PlayerExtensionError):
 
 class PlayerError(PlayerExtensionError):
     pass
+
+
+class ExtractionCancelledError(PlayerExtensionError):
+    pass
+
+
+class ExtractionTimeoutError(PlayerExtensionError):
+    pass
+
+
+class CircuitOpenError(PlayerExtensionError):
+    pass
+
+
+class UpstreamError(PlayerExtensionError):
+    """Upstream is unavailable (connection errors, server errors, etc)."""
+
+    pass
@@ -21,7 +21,7 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Sequence
+from typing import Optional, Sequence
 
 from concord.constants import EventType
 from concord.ext.base import (
@@ -35,11 +35,19 @@ from concord.extension import Extension
 from concord.middleware import Middleware, MiddlewareState, chain_of
 
 from concord.ext.player.middleware import (
+    Autoplay,
+    Jump,
+    Move,
     Pause,
     Play,
+    Queue,
+    Remove,
     Resume,
+    Shuffle,
     Skip,
+    Stats,
     Stop,
+    Subcommands,
     Volume,
 )
 from concord.ext.player.state import State
@@ -51,83 +59,46 @@ class PlayerExtension(Extension):
     DESCRIPTION = "Player extension (music-related functionality) for Concord"
     VERSION = version
 
-    def __init__(self) -> None:
+    def __init__(self, state: Optional[State] = None) -> None:
         super().__init__()
 
-        self._state = State()
+        self._state = state or State()
+        commands = [
+            (Play(), "play", "(?P<url>.+)?"),
+            (Pause(), "pause", None),
+            (Resume(), "resume", None),
+            (Stop(), "stop", None),
+            (Skip(), "skip", None),
+            (Volume(), "volume", "(?P<volume>.+)?"),
+            (Queue(), "queue", "(?P<url>.+)?"),
+            (Remove(), "remove", "(?P<index>.+)?"),
+            (Move(), "move", r"(?P<source>\S+)?\s*(?P<target>\S+)?"),
+            (Shuffle(), "shuffle", None),
+            (Jump(), "jump", "(?P<index>.+)?"),
+            (Autoplay(), "autoplay", r"(?P<mode>\S+)?\s*(?P<url>.+)?"),
+            (Stats(), "stats", None),
+        ]
+        # Every message is normalized and filtered only once, then the
+        # subcommand is found by its name.
         self._extension_middleware = [
             chain_of(
                 [
-                    Play(),
-                    MiddlewareState(self._state),
-                    Command("play", rest_pattern="(?P<url>.+)?"),
-                    Command("player"),
-                    ChannelTypeFilter(guild=True),
-                    BotFilter(authored_by_bot=False),
-                    EventTypeFilter(EventType.MESSAGE),
-                    EventNormalization(),
-                ]
-            ),
-            chain_of(
-                [
-                    Pause(),
-                    MiddlewareState(self._state),
-                    Command("pause"),
-                    Command("player"),
-                    ChannelTypeFilter(guild=True),
-                    BotFilter(authored_by_bot=False),
-                    EventTypeFilter(EventType.MESSAGE),
-                    EventNormalization(),
-                ]
-            ),
-            chain_of(
-                [
-                    Resume(),
-                    MiddlewareState(self._state),
-                    Command("resume"),
-                    Command("player"),
-                    ChannelTypeFilter(guild=True),
-                    BotFilter(authored_by_bot=False),
-                    EventTypeFilter(EventType.MESSAGE),
-                    EventNormalization(),
-                ]
-            ),
-            chain_of(
-                [
-                    Stop(),
-                    MiddlewareState(self._state),
-                    Command("stop"),
-                    Command("player"),
-                    ChannelTypeFilter(guild=True),
-                    BotFilter(authored_by_bot=False),
-                    EventTypeFilter(EventType.MESSAGE),
-                    EventNormalization(),
-                ]
-            ),
-            chain_of(
-                [
-                    Skip(),
-                    MiddlewareState(self._state),
-                    Command("skip"),
-                    Command("player"),
-                    ChannelTypeFilter(guild=True),
-                    BotFilter(authored_by_bot=False),
-                    EventTypeFilter(EventType.MESSAGE),
-                    EventNormalization(),
-                ]
-            ),
-            chain_of(
-                [
-                    Volume(),
+                    Subcommands(
+                        {
+                            name: chain_of(
+                                [middleware, Command(name, rest_pattern=rest)]
+                            )
+                            for middleware, name, rest in commands
+                        }
+                    ),
                     MiddlewareState(self._state),
-                    Command("volume", rest_pattern="(?P<volume>.+)?"),
                     Command("player"),
                     ChannelTypeFilter(guild=True),
                     BotFilter(authored_by_bot=False),
                     EventTypeFilter(EventType.MESSAGE),
                     EventNormalization(),
                 ]
-            ),
+            )
         ]
 
     @property
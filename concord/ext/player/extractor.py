@@ -23,11 +23,30 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import abc
 import asyncio
+import collections.abc
 import functools
+import http.client
+import itertools
+import logging
+import sys
+import threading
+import urllib.error
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import streamlink
 import youtube_dl
 
+from concord.ext.player.breaker import CircuitBreaker, NegativeCache
 from concord.ext.player.entry import (
     Entry,
     Playlist,
@@ -36,32 +55,258 @@ from concord.ext.player.entry import (
 )
 from concord.ext.player.exceptions import (
     EmptyStreamError,
+    ExtractionTimeoutError,
     PlayerExtensionError,
     UnsupportedURLError,
+    UpstreamError,
 )
+from concord.ext.player.formats import FormatPolicy
+
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class _Cancelled(BaseException):
+    """Unwinds blocking work in an executor thread, when it is cancelled.
+
+    It is not an :class:`Exception` subclass, so third-party code will not
+    swallow it.
+    """
+
+    pass
+
+
+def _check_cancelled():
+    """Cancellation point for blocking work in an executor thread."""
+    event = getattr(_local, "cancelled", None)
+    if event is not None and event.is_set():
+        raise _Cancelled()
+
+
+def _is_network_error(error: Optional[BaseException]) -> bool:
+    """Checks, if the error is caused by the upstream's health (connection
+    errors, timeouts, server errors), not by the requested url."""
+    if isinstance(error, youtube_dl.utils.ExtractorError):
+        error = error.cause
+    #
+    if isinstance(error, urllib.error.HTTPError):
+        status = error.code
+    else:
+        # HTTP errors of Requests, used by Streamlink.
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status >= 500 or status == 429
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+def _extraction_error(error: Exception) -> PlayerExtensionError:
+    """Returns extension's error for an error of third-party code."""
+    if _is_network_error(error):
+        return UpstreamError()
+    return PlayerExtensionError()
+
+
+def _take(iterator: Iterator, count: int) -> List:
+    return list(itertools.islice(iterator, count))
+
+
+def _run_cancellable(cancelled: threading.Event, fn: Callable, *args):
+    _local.cancelled = cancelled
+    try:
+        _check_cancelled()
+        return fn(*args)
+    finally:
+        _local.cancelled = None
 
 
 class Extractor(abc.ABC):
     """Abstract extractor class.
 
+    Blocking work should be run with :meth:`_run_blocking`, so it can be
+    cancelled and timed out.
+
     Attributes
     ----------
     ALIASES : list
         Alias names for extractor.
+    TIMEOUT : float
+        Default timeout in seconds for extract and resolve calls. ``None``
+        disables timeouts.
+    FFMPEG_INPUT_OPTIONS : dict
+        FFmpeg input options (reconnect, buffer sizes, probe size, etc) for
+        streams, resolved by extractor. Can be overridden per instance.
+    negative_cache : :class:`NegativeCache`
+        Recent failures of urls and entries.
+    breaker : :class:`CircuitBreaker`
+        Circuit breaker for calls to the upstream.
     """
 
     ALIASES = []
+    TIMEOUT = 30.0
+    FFMPEG_INPUT_OPTIONS = {}
+
+    def __init__(self):
+        self.negative_cache = NegativeCache()
+        self.breaker = CircuitBreaker()
 
-    @abc.abstractmethod
     async def extract(
-        self, source_url: str, loop: asyncio.AbstractEventLoop
+        self, url: str, *, timeout: Optional[float] = None
     ) -> Playlist:
-        pass  # pragma: no cover
+        """Extracts a playlist by given url.
+
+        Recently failed urls fail fast with the same error, as well as all
+        calls, while the upstream is failing.
+        """
+        return await self._guard(
+            url, functools.partial(self._extract, url, timeout=timeout)
+        )
 
     async def resolve(
-        self, entry: Entry, loop: asyncio.AbstractEventLoop
+        self,
+        entry: Entry,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
     ) -> str:
-        pass
+        """Resolves stream url of given entry.
+
+        Format policy is applied, if extractor supports format selection,
+        otherwise it is ignored. Chosen format is reported in the entry's
+        :attr:`Entry.stream_format`.
+
+        Recently failed entries fail fast with the same error, as well as all
+        calls, while the upstream is failing.
+        """
+        return await self._guard(
+            entry.key or entry.source_url,
+            functools.partial(
+                self._resolve, entry, timeout=timeout, policy=policy
+            ),
+        )
+
+    async def related(
+        self, entry: Entry, *, timeout: Optional[float] = None
+    ) -> Playlist:
+        """Returns entries, related to given one (recommendations).
+
+        Returns empty playlist by default.
+        """
+        return Playlist()
+
+    @abc.abstractmethod
+    async def _extract(
+        self, url: str, *, timeout: Optional[float] = None
+    ) -> Playlist:
+        pass  # pragma: no cover
+
+    @abc.abstractmethod
+    async def _resolve(
+        self,
+        entry: Entry,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
+    ) -> str:
+        pass  # pragma: no cover
+
+    async def _guard(self, key: Optional[str], fn: Callable[[], Awaitable]):
+        if key is not None:
+            self.negative_cache.check(key)
+        #
+        try:
+            return await self.breaker.call(fn)
+        except PlayerExtensionError as error:
+            if key is not None:
+                self.negative_cache.add(key, error)
+            raise
+
+    def ffmpeg_before_options(self) -> str:
+        """Returns FFmpeg input options for streams, resolved by extractor."""
+        return " ".join(
+            f"-{name} {value}"
+            for name, value in self.FFMPEG_INPUT_OPTIONS.items()
+        )
+
+    async def _run_blocking(
+        self, fn: Callable, *args, timeout: Optional[float] = None
+    ):
+        """Runs blocking function in the default executor.
+
+        If the call is cancelled or timed out, the function will be
+        interrupted at the next cancellation point (if there's any), so the
+        executor's thread is released as soon as possible.
+
+        Raises:
+            ExtractionTimeoutError: If the call is timed out.
+        """
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        future = loop.run_in_executor(
+            None, functools.partial(_run_cancellable, cancelled, fn, *args)
+        )
+
+        if timeout is None:
+            timeout = self.TIMEOUT
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise ExtractionTimeoutError()
+        finally:
+            cancelled.set()
+
+
+class _PageCursor:
+    """Position in entries of not processed playlist, to load pages from.
+
+    If loading of a page is interrupted (e.g. timed out), iteration over
+    entries is started again from the position. Lazy generators of entries
+    can't be iterated again, so they are dropped.
+    """
+
+    def __init__(self, entries: Iterable):
+        self.entries = entries
+        self.offset = 0
+        self.iterator = None
+
+    def interrupt(self):
+        """Drops the iterator, that is broken by interrupted iteration."""
+        self.iterator = None
+        restartable = hasattr(self.entries, "getslice") or isinstance(
+            self.entries, collections.abc.Sequence
+        )
+        if not restartable:
+            self.entries = None
+
+
+class _YouTubeDLLogger:
+    """Youtube-DL logger.
+
+    Youtube-DL reports every step (like downloading a webpage) to the logger,
+    so it is used as a cancellation point.
+
+    With ``ignoreerrors``, errors are reported to the logger instead of being
+    raised, so upstream failures are raised from here, to be told apart from
+    errors of requested urls.
+    """
+
+    def debug(self, msg: str):
+        _check_cancelled()
+
+    def warning(self, msg: str):
+        _check_cancelled()
+        log.warning(msg)
+
+    def error(self, msg: str):
+        _check_cancelled()
+        log.error(msg)
+        # Errors are reported from the exception handler, if there's one.
+        error = sys.exc_info()[1]
+        if isinstance(error, UpstreamError):
+            raise error
+        if _is_network_error(error):
+            raise UpstreamError() from error
 
 
 class YouTubeDLExtractor(Extractor):
@@ -71,77 +316,260 @@ class YouTubeDLExtractor(Extractor):
     ----------
     ALIASES : list
         Alias names for extractor.
+    PAGE_SIZE : int
+        Number of playlist's entries to load at once.
+    MAX_REDIRECTS : int
+        Maximum number of url results to follow during extraction.
+    MIX_URL : str
+        Url of YouTube's playlist with related videos.
+    POLICY : :class:`FormatPolicy`
+        Default format policy, if no policy is given on resolve.
     OPTIONS : dict
         Youtube-DL extract options.
-    session : :class:`youtube_dl.YoutubeDL`
-        Youtube-DL session object.
+    session_extractor : :class:`youtube_dl.YoutubeDL`
+        Youtube-DL session object for extraction.
+    session_resolver : :class:`youtube_dl.YoutubeDL`
+        Youtube-DL session object for resolution with the default policy.
     """
 
     ALIASES = ["youtube-dl", "youtubedl", "ytdl", "ydl"]
 
+    PAGE_SIZE = 100
+    MAX_REDIRECTS = 3
+    MIX_URL = "https://www.youtube.com/playlist?list=RD{id}"
+    POLICY = FormatPolicy()
+
     OPTIONS = {
-        "format": "bestaudio/best",
+        "format": POLICY.selector,
         "default_search": "auto",
         "ignoreerrors": True,
         "noplaylist": True,
         "skip_download": True,
         "quiet": True,
+        "logger": _YouTubeDLLogger(),
     }
     EXTRACT_OPTIONS = {**OPTIONS, "extract_flat": True}
     RESOLVE_OPTIONS = {**OPTIONS}
 
+    FFMPEG_INPUT_OPTIONS = {
+        "reconnect": 1,
+        "reconnect_streamed": 1,
+        "reconnect_delay_max": 5,
+    }
+
     def __init__(self):
+        super().__init__()
         self.session_extractor = youtube_dl.YoutubeDL(
             params=self.EXTRACT_OPTIONS
         )
         self.session_resolver = youtube_dl.YoutubeDL(
             params=self.RESOLVE_OPTIONS
         )
+        self._resolvers = {self.POLICY.selector: self.session_resolver}
 
-    async def extract(
-        self, url: str, loop: asyncio.AbstractEventLoop
-    ) -> Playlist:  # noqa: D102
+    def _get_resolver(
+        self, policy: Optional[FormatPolicy]
+    ) -> youtube_dl.YoutubeDL:
+        """Returns Youtube-DL session object for resolution with given policy.
+
+        Sessions are created once per format selector.
+        """
+        selector = (policy or self.POLICY).selector
+        session = self._resolvers.get(selector)
+        if session is None:
+            session = self._resolvers[selector] = youtube_dl.YoutubeDL(
+                params={**self.RESOLVE_OPTIONS, "format": selector}
+            )
+        return session
+
+    async def _extract_info(
+        self,
+        url: str,
+        *,
+        ie_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
         try:
-            info = await loop.run_in_executor(
-                None,
-                functools.partial(self.session_extractor.extract_info, url),
+            info = await self._run_blocking(
+                functools.partial(
+                    self.session_extractor.extract_info,
+                    url,
+                    download=False,
+                    ie_key=ie_key,
+                    process=False,
+                ),
+                timeout=timeout,
             )
-        except Exception:
+        except (asyncio.CancelledError, PlayerExtensionError):
+            raise
+        except Exception as error:
+            raise _extraction_error(error) from error
+        #
+        if info is None:
             raise PlayerExtensionError()
+        return info
+
+    async def _extract(
+        self, url: str, *, timeout: Optional[float] = None
+    ) -> Playlist:  # noqa: D102
+        # Info is not processed, so playlist's entries are not fetched yet.
+        info = await self._extract_info(url, timeout=timeout)
+        # Url results (like search queries) should be followed.
+        for _ in range(self.MAX_REDIRECTS):
+            if info.get("_type") not in ("url", "url_transparent"):
+                break
+            info = await self._extract_info(
+                info["url"], ie_key=info.get("ie_key"), timeout=timeout
+            )
         #
         type = info.get("_type", "video")
-        playlist = Playlist()
 
         if type == "video":
+            playlist = Playlist()
             playlist.entries.append(
                 YouTubeDLEntry(info, source_url=url, extractor=self)
             )
         elif type == "playlist":
-            playlist.source_url = url
-            for entry in info["entries"]:
-                playlist.entries.append(YouTubeDLEntry(entry, extractor=self))
+            playlist = Playlist(
+                source_url=url,
+                loader=functools.partial(
+                    self._load_page, _PageCursor(info["entries"])
+                ),
+            )
+            await playlist.ensure(0)
+            if len(playlist.entries) == 0:
+                raise EmptyStreamError()
         else:
             raise UnsupportedURLError()
         #
         return playlist
 
-    async def resolve(
-        self, entry: YouTubeDLEntry, loop: asyncio.AbstractEventLoop
+    async def related(
+        self, entry: YouTubeDLEntry, *, timeout: Optional[float] = None
+    ) -> Playlist:  # noqa: D102
+        # YouTube's "mix" of a video is a playlist of related videos.
+        key = entry.key
+        if key is None or not key.startswith("Youtube:"):
+            return Playlist()
+        return await self.extract(
+            self.MIX_URL.format(id=entry.metadata["id"]), timeout=timeout
+        )
+
+    def _iter_entries(self, entries: Iterable, start: int) -> Iterator[Dict]:
+        """Iterates over entries of not processed playlist, starting from given
+        index.
+
+        Entries can be a list, a lazy generator or a paged list.
+        """
+        if not hasattr(entries, "getslice"):
+            yield from itertools.islice(entries, start, None)
+            return
+        #
+        while True:
+            page = entries.getslice(start, start + self.PAGE_SIZE)
+            yield from page
+            if len(page) < self.PAGE_SIZE:
+                return
+            start += self.PAGE_SIZE
+
+    async def _load_page(self, cursor: _PageCursor) -> List[Tuple]:
+        """Loads the next page of playlist's entries.
+
+        Entries are returned in a compact form, see :class:`EntryQueue`.
+        """
+        if cursor.iterator is None:
+            if cursor.entries is None:
+                # Iteration is interrupted and can't be started again.
+                raise PlayerExtensionError()
+            cursor.iterator = self._iter_entries(cursor.entries, cursor.offset)
+        #
+        try:
+            page = await self._run_blocking(
+                _take, cursor.iterator, self.PAGE_SIZE
+            )
+        except (asyncio.CancelledError, PlayerExtensionError):
+            cursor.interrupt()
+            raise
+        except Exception as error:
+            cursor.interrupt()
+            raise _extraction_error(error) from error
+        cursor.offset += len(page)
+        #
+        from_url, from_info = self._entry_from_url, self._entry_from_info
+        result = []
+
+        for info in page:
+            # Broken entries are reported as `None` due to `ignoreerrors`.
+            if info is None:
+                continue
+            if info.get("_type") in ("url", "url_transparent"):
+                result.append(
+                    (
+                        from_url,
+                        info["url"],
+                        info.get("ie_key"),
+                        info.get("id"),
+                        info.get("title"),
+                        info.get("duration"),
+                    )
+                )
+            else:
+                result.append((from_info, info))
+        #
+        return result
+
+    def _entry_from_url(
+        self,
+        url: str,
+        ie_key: Optional[str],
+        id: Optional[str],
+        title: Optional[str],
+        duration: Optional[float],
+    ) -> YouTubeDLEntry:
+        metadata = {"_type": "url", "url": url}
+        for name, value in (
+            ("ie_key", ie_key),
+            ("id", id),
+            ("title", title),
+            ("duration", duration),
+        ):
+            if value is not None:
+                metadata[name] = value
+        #
+        return YouTubeDLEntry(metadata, extractor=self)
+
+    def _entry_from_info(self, info: Dict) -> YouTubeDLEntry:
+        return YouTubeDLEntry(info, extractor=self)
+
+    async def _resolve(
+        self,
+        entry: YouTubeDLEntry,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
     ) -> str:  # noqa: D102
         try:
-            info = await loop.run_in_executor(
-                None,
-                functools.partial(
-                    self.session_resolver.process_ie_result, entry.metadata
-                ),
+            info = await self._run_blocking(
+                self._get_resolver(policy).process_ie_result,
+                entry.metadata,
+                timeout=timeout,
             )
-        except Exception:
-            raise PlayerExtensionError()
+        except (asyncio.CancelledError, PlayerExtensionError):
+            raise
+        except Exception as error:
+            raise _extraction_error(error) from error
 
+        if info is None:
+            raise EmptyStreamError()
         type = info.get("_type", "video")
-        if type == "video" and "url" in info:
-            return info["url"]
-        raise EmptyStreamError()
+        if type != "video" or "url" not in info:
+            raise EmptyStreamError()
+        #
+        entry.stream_format = {
+            name: info.get(name)
+            for name in ("format_id", "acodec", "abr", "asr")
+        }
+        return info["url"]
 
 
 class StreamlinkExtractor(Extractor):
@@ -157,20 +585,28 @@ class StreamlinkExtractor(Extractor):
 
     ALIASES = ["streamlink", "sl", "livestreamer", "ls"]
 
+    FFMPEG_INPUT_OPTIONS = {
+        "reconnect": 1,
+        "reconnect_streamed": 1,
+        "reconnect_delay_max": 5,
+    }
+
     def __init__(self):
+        super().__init__()
         self.session = streamlink.Streamlink()
 
     async def _fetch(
-        self, url: str, loop: asyncio.AbstractEventLoop
+        self, url: str, *, timeout: Optional[float] = None
     ):  # noqa: D102
         try:
-            streams = await loop.run_in_executor(
-                None, functools.partial(self.session.streams, url)
+            streams = await self._run_blocking(
+                self.session.streams, url, timeout=timeout
             )
         except streamlink.NoPluginError:
             raise UnsupportedURLError()
-        except streamlink.PluginError:
-            raise PlayerExtensionError()
+        except streamlink.PluginError as error:
+            cause = error.__cause__ or getattr(error, "err", None)
+            raise _extraction_error(cause) from error
         #
         if not streams:
             raise EmptyStreamError()
@@ -179,16 +615,209 @@ class StreamlinkExtractor(Extractor):
         #
         return streams
 
-    async def extract(
-        self, url: str, loop: asyncio.AbstractEventLoop
+    async def _extract(
+        self, url: str, *, timeout: Optional[float] = None
     ) -> Playlist:  # noqa: D102
-        _ = await self._fetch(url, loop)
+        _ = await self._fetch(url, timeout=timeout)
         playlist = Playlist()
         playlist.entries.append(StreamlinkEntry(source_url=url, extractor=self))
         return playlist
 
-    async def resolve(
-        self, entry: StreamlinkEntry, loop: asyncio.AbstractEventLoop
+    async def _resolve(
+        self,
+        entry: StreamlinkEntry,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
     ) -> str:  # noqa: D102
-        streams = await self._fetch(entry.source_url, loop)
+        streams = await self._fetch(entry.source_url, timeout=timeout)
         return streams["best"].url
+
+
+class ExtractorChain(Extractor):
+    """Chain of extractors, that are tried one by one.
+
+    Extraction is done by the first extractor (in priority order), that
+    succeeds. Resolution of an entry is done by its own extractor first, then
+    by other extractors: they extract the entry's page url again and resolve
+    the result.
+
+    In the ``"fallback"`` mode, the next extractor is tried, if the previous
+    one has failed. In the ``"race"`` mode, the next extractor is also started,
+    if the previous one hasn't finished in :attr:`hedge_delay` seconds, so a
+    slow upstream doesn't delay the playback. The first successful result is
+    used, other calls are cancelled.
+
+    Parameters
+    ----------
+    extractors : sequence of :class:`Extractor`
+        Extractors in priority order.
+    mode : str
+        ``"fallback"`` or ``"race"`` mode for resolution.
+    hedge_delay : float
+        Delay in seconds before starting the next extractor in the ``"race"``
+        mode.
+
+    Attributes
+    ----------
+    ALIASES : list
+        Alias names for extractor.
+    MODES : tuple
+        Supported modes.
+    HEDGE_DELAY : float
+        Default delay before starting the next extractor.
+    extractors : list of :class:`Extractor`
+        Extractors in priority order.
+    mode : str
+        Mode for resolution.
+    hedge_delay : float
+        Delay in seconds before starting the next extractor.
+    """
+
+    ALIASES = ["auto", "chain"]
+    MODES = ("fallback", "race")
+    HEDGE_DELAY = 2.0
+
+    def __init__(
+        self,
+        extractors: Sequence[Extractor],
+        *,
+        mode: str = "fallback",
+        hedge_delay: float = HEDGE_DELAY,
+    ):
+        super().__init__()
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        #
+        self.extractors = list(extractors)
+        self.mode = mode
+        self.hedge_delay = hedge_delay
+
+    async def _guard(self, key: Optional[str], fn: Callable[[], Awaitable]):
+        # Extractors of the chain have their own negative caches and circuit
+        # breakers.
+        return await fn()
+
+    def ffmpeg_before_options(self) -> str:  # noqa: D102
+        if not self.extractors:
+            return super().ffmpeg_before_options()
+        return self.extractors[0].ffmpeg_before_options()
+
+    async def related(
+        self, entry: Entry, *, timeout: Optional[float] = None
+    ) -> Playlist:  # noqa: D102
+        if entry.has_extractor() and entry.extractor is not self:
+            return await entry.extractor.related(entry, timeout=timeout)
+        return Playlist()
+
+    async def _extract(
+        self, url: str, *, timeout: Optional[float] = None
+    ) -> Playlist:  # noqa: D102
+        # Extractors can return different playlists for the same url, so they
+        # are never raced here.
+        return await self._first(
+            [
+                functools.partial(extractor.extract, url, timeout=timeout)
+                for extractor in self.extractors
+            ],
+            hedge_delay=None,
+        )
+
+    async def _resolve(
+        self,
+        entry: Entry,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
+    ) -> str:  # noqa: D102
+        calls = []
+        if entry.has_extractor() and entry.extractor is not self:
+            calls.append(
+                functools.partial(
+                    entry.extractor.resolve,
+                    entry,
+                    timeout=timeout,
+                    policy=policy,
+                )
+            )
+        #
+        url = entry.page_url
+        if url is not None:
+            for extractor in self.extractors:
+                if extractor is entry.extractor:
+                    continue
+                calls.append(
+                    functools.partial(
+                        self._resolve_with,
+                        extractor,
+                        entry,
+                        url,
+                        timeout=timeout,
+                        policy=policy,
+                    )
+                )
+        #
+        return await self._first(
+            calls, hedge_delay=self.hedge_delay if self.mode == "race" else None
+        )
+
+    async def _resolve_with(
+        self,
+        extractor: Extractor,
+        entry: Entry,
+        url: str,
+        *,
+        timeout: Optional[float] = None,
+        policy: Optional[FormatPolicy] = None,
+    ) -> str:
+        playlist = await extractor.extract(url, timeout=timeout)
+        await playlist.ensure(0)
+        if len(playlist.entries) == 0:
+            raise EmptyStreamError()
+        #
+        other = playlist.entries[0]
+        stream_url = await other.resolve(timeout=timeout, policy=policy)
+        entry.stream_format = other.stream_format
+        return stream_url
+
+    async def _first(
+        self,
+        calls: Sequence[Callable[[], Awaitable]],
+        *,
+        hedge_delay: Optional[float],
+    ):
+        """Returns result of the first successful call.
+
+        The next call is started, if all started calls have failed, or after
+        given delay (if it is not ``None``). Calls in progress are cancelled,
+        when the result is found or on error.
+
+        Raises:
+            PlayerExtensionError: Error of the last failed call, if all calls
+                have failed.
+        """
+        error = UnsupportedURLError()
+        calls = iter(calls)
+        pending = set()
+
+        try:
+            while True:
+                call = next(calls, None)
+                if call is not None:
+                    pending.add(asyncio.ensure_future(call()))
+                if not pending:
+                    raise error
+                #
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if call is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    try:
+                        return task.result()
+                    except PlayerExtensionError as e:
+                        error = e
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,91 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from typing import Optional, Sequence
+
+
+class FormatPolicy:
+    """Policy of audio format selection for Youtube-DL.
+
+    Formats are preferred in order: audio-only formats with preferred codecs,
+    any audio-only formats, then formats with video (if allowed). Limits are
+    applied to all of them, but formats with unknown bitrate or sample rate
+    are not filtered out. If nothing is matched, limits are dropped.
+
+    Args:
+        codecs: Preferred audio codecs, in priority order.
+        max_abr: Maximum audio bitrate, in KBit/s, or ``None`` for no limit.
+        max_asr: Maximum audio sample rate, in Hz, or ``None`` for no limit.
+        allow_video: Can formats with video be selected, if there's no
+            audio-only formats.
+
+    Attributes:
+        codecs: Preferred audio codecs, in priority order.
+        max_abr: Maximum audio bitrate, in KBit/s.
+        max_asr: Maximum audio sample rate, in Hz.
+        allow_video: Can formats with video be selected.
+        selector: Youtube-DL format selector of the policy.
+    """
+
+    def __init__(
+        self,
+        *,
+        codecs: Sequence[str] = ("opus",),
+        max_abr: Optional[float] = None,
+        max_asr: Optional[int] = None,
+        allow_video: bool = True,
+    ):
+        self.codecs = tuple(codecs)
+        self.max_abr = max_abr
+        self.max_asr = max_asr
+        self.allow_video = allow_video
+        self.selector = self._build_selector()
+
+    def _build_selector(self) -> str:
+        limits = ""
+        if self.max_abr is not None:
+            limits += f"[abr<=?{self.max_abr:g}]"
+        if self.max_asr is not None:
+            limits += f"[asr<=?{self.max_asr}]"
+        #
+        selectors = [f"bestaudio[acodec={codec}]" for codec in self.codecs]
+        selectors.append("bestaudio")
+        if self.allow_video:
+            selectors.append("best")
+        #
+        alternatives = [selector + limits for selector in selectors]
+        if limits:
+            alternatives.extend(selectors)
+        # Alternatives without limits may be the same as with them.
+        return "/".join(dict.fromkeys(alternatives))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FormatPolicy):
+            return NotImplemented
+        return self.selector == other.selector
+
+    def __hash__(self) -> int:
+        return hash(self.selector)
+
+    def __repr__(self) -> str:
+        return f"<FormatPolicy {self.selector!r}>"
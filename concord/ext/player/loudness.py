@@ -0,0 +1,179 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import collections
+import json
+import shlex
+from typing import Optional, Tuple
+
+
+class LoudnessAnalyzer:
+    """Loudness analyzer of tracks.
+
+    Loudness (EBU R128 integrated loudness) is measured by FFmpeg's
+    ``loudnorm`` filter on the first ``window`` seconds of a track, and the
+    gain to reach the target loudness is cached per track identity, so every
+    track is analyzed only once. The gain never raises the track's true peak
+    above ``max_peak``, so quiet, but peaky tracks don't clip.
+
+    Args:
+        target: Target loudness, in LUFS.
+        window: Duration of the analyzed part of a track, in seconds.
+        max_boost: Maximum gain, in dB.
+        max_cut: Maximum attenuation, in dB.
+        max_peak: Maximum true peak after the gain, in dBTP.
+        max_size: Maximum number of cached gains.
+        max_jobs: Maximum number of concurrent analyses.
+
+    Attributes:
+        target: Target loudness, in LUFS.
+        window: Duration of the analyzed part of a track, in seconds.
+        max_boost: Maximum gain, in dB.
+        max_cut: Maximum attenuation, in dB.
+        max_peak: Maximum true peak after the gain, in dBTP.
+        max_size: Maximum number of cached gains.
+        max_jobs: Maximum number of concurrent analyses.
+    """
+
+    def __init__(
+        self,
+        *,
+        target: float = -16.0,
+        window: float = 60.0,
+        max_boost: float = 10.0,
+        max_cut: float = 20.0,
+        max_peak: float = -1.0,
+        max_size: int = 100_000,
+        max_jobs: int = 2,
+    ):
+        self.target = target
+        self.window = window
+        self.max_boost = max_boost
+        self.max_cut = max_cut
+        self.max_peak = max_peak
+        self.max_size = max_size
+        self.max_jobs = max_jobs
+
+        self._gains = collections.OrderedDict()
+        self._pending = set()
+        self._jobs = None
+
+    def gain(self, key: str) -> Optional[float]:
+        """Returns cached gain (volume multiplier) of the track.
+
+        Args:
+            key: The track identity.
+
+        Returns:
+            The gain, or ``None``, if the track isn't analyzed yet.
+        """
+        gain = self._gains.get(key)
+        if gain is not None:
+            self._gains.move_to_end(key)
+        return gain
+
+    async def analyze(
+        self, key: str, location: str, *, before_options: str = ""
+    ) -> Optional[float]:
+        """Analyzes the track and caches its gain.
+
+        Args:
+            key: The track identity.
+            location: The track's audio url or file.
+            before_options: FFmpeg input options for the audio.
+
+        Returns:
+            The gain, or ``None``, if the track can't be analyzed or is being
+            analyzed already.
+        """
+        if key in self._pending:
+            return None
+        if self._jobs is None:
+            self._jobs = asyncio.Semaphore(self.max_jobs)
+        #
+        self._pending.add(key)
+        try:
+            async with self._jobs:
+                measurement = await self._measure(location, before_options)
+        finally:
+            self._pending.discard(key)
+        #
+        if measurement is None:
+            return None
+        loudness, peak = measurement
+        gain = min(self.target - loudness, self.max_boost, self.max_peak - peak)
+        gain = 10 ** (max(gain, -self.max_cut) / 20)
+
+        self._gains[key] = gain
+        if len(self._gains) > self.max_size:
+            self._gains.popitem(last=False)
+        return gain
+
+    async def _measure(
+        self, location: str, before_options: str
+    ) -> Optional[Tuple[float, float]]:
+        """Returns integrated loudness (LUFS) and true peak (dBTP)."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-nostdin",
+                "-hide_banner",
+                *shlex.split(before_options),
+                "-t",
+                str(self.window),
+                "-i",
+                location,
+                "-vn",
+                "-af",
+                "loudnorm=print_format=json",
+                "-f",
+                "null",
+                "-",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError:
+            return None
+        #
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        if process.returncode != 0:
+            return None
+
+        # Measurements are printed as the last JSON object.
+        output = stderr.decode("utf-8", "replace")
+        start = output.rfind("{")
+        try:
+            measurements = json.loads(output[start:])
+            loudness = float(measurements["input_i"])
+            peak = float(measurements["input_tp"])
+        except (ValueError, KeyError):
+            return None
+        # Silence has no loudness.
+        if loudness == float("-inf"):
+            return None
+        return loudness, peak
@@ -21,20 +21,122 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Callable, Optional
+import itertools
+import re
+from typing import Callable, Dict, Optional
 
 from concord.context import Context
 from concord.ext import audio
-from concord.middleware import Middleware, MiddlewareState
+from concord.ext.base.filters.command import CommandContextState
+from concord.middleware import Middleware, MiddlewareResult, MiddlewareState
 
+from concord.ext.player.autoplay import AutoplayBuffer
+from concord.ext.player.entry import Playlist
 from concord.ext.player.exceptions import (
+    CircuitOpenError,
     EmptyStreamError,
+    ExtractionCancelledError,
+    ExtractionTimeoutError,
     PlayerExtensionError,
     UnsupportedURLError,
+    UpstreamError,
 )
+from concord.ext.player.player import Player
 from concord.ext.player.state import State
 
 
+async def _extract(
+    channel,
+    state: State,
+    player: Player,
+    extractor: str,
+    url: str,
+    *,
+    replace: bool = False,
+) -> Optional[Playlist]:
+    """Extracts a playlist by given url and reports errors to the channel.
+
+    See :meth:`Player.extract` for ``replace``.
+
+    Returns:
+        Extracted playlist, or ``None``, if extraction has failed.
+    """
+    if extractor not in state.extractors:
+        await channel.send("Extractor not found.")
+        return None
+    #
+    try:
+        return await player.extract(
+            state.extractors[extractor], url, replace=replace
+        )
+    except UnsupportedURLError:
+        await channel.send("Provided URL is not supported.")
+    except EmptyStreamError:
+        await channel.send("Nothing to play found by provided URL.")
+    except ExtractionCancelledError:
+        pass
+    except ExtractionTimeoutError:
+        await channel.send("Timed out during resolving provided URL.")
+    except (CircuitOpenError, UpstreamError):
+        await channel.send("Extractor is temporarily unavailable.")
+    except PlayerExtensionError:
+        await channel.send("Error during resolving provided URL.")
+    return None
+
+
+def _parse_index(value: Optional[str], player: Player) -> Optional[int]:
+    """Converts user-provided (1-based) playlist index into the real one.
+
+    Returns:
+        Playlist index, or ``None``, if there's no such entry.
+    """
+    try:
+        index = int(value) - 1
+    except (TypeError, ValueError):
+        return None
+    #
+    if not 0 <= index < len(player.playlist.entries):
+        return None
+    return index
+
+
+class Subcommands(Middleware):
+    """Middleware for dispatching a message to one of the subcommands.
+
+    Subcommand is looked up in the table by the next word of the message, so
+    only one subcommand's middleware is run, instead of trying all of them.
+
+    Args:
+        commands: Map subcommand name -> middleware to run for it.
+
+    Attributes:
+        commands: Map lower-cased subcommand name -> middleware to run for it.
+    """
+
+    WORD_PATTERN = re.compile(r"\s*(\w+)")
+
+    def __init__(self, commands: Dict[str, Middleware]):
+        super().__init__()
+        self.commands = {
+            name.lower(): middleware for name, middleware in commands.items()
+        }
+
+    async def run(
+        self, *args, ctx: Context, next: Callable, **kwargs
+    ):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, CommandContextState)
+        position = state.last_position if state is not None else 0
+
+        match = self.WORD_PATTERN.match(ctx.kwargs["message"].content, position)
+        if match is None:
+            return MiddlewareResult.IGNORE
+        #
+        middleware = self.commands.get(match.group(1).lower())
+        if middleware is None:
+            return MiddlewareResult.IGNORE
+        return await middleware.run(*args, ctx=ctx, next=next, **kwargs)
+
+
 class Play(Middleware):
     """Middleware for playing provided audio's url in a user's voice channel."""
 
@@ -62,25 +164,14 @@ class Play(Middleware):
             await channel.send("Provide URL to play.")
             return
         elif url:
-            if extractor not in state.extractors:
-                await channel.send("Extractor not found.")
+            playlist = await _extract(
+                channel, state, player, extractor, url, replace=True
+            )
+            if playlist is None:
                 return
             #
-            try:
-                playlist = await state.extractors[extractor].extract(
-                    url, ctx.client.loop
-                )
-                player.stop()
-                player.set_playlist(playlist)
-            except UnsupportedURLError:
-                await channel.send("Provided URL is not supported.")
-                return
-            except EmptyStreamError:
-                await channel.send("Nothing to play found by provided URL.")
-                return
-            except PlayerExtensionError:
-                await channel.send("Error during resolving provided URL.")
-                return
+            player.stop()
+            player.set_playlist(playlist)
         #
         if audio_state.voice_client is None:
             await channel.send("I'm not connected to voice channel.")
@@ -166,7 +257,7 @@ class Stop(Middleware):
         if audio_state.voice_client is None:
             await channel.send("I'm not connected to voice channel.")
             return
-        if player.is_stopped():
+        if player.is_stopped() and not player.is_extracting():
             await channel.send("I'm not playing audio.")
             return
         #
@@ -230,3 +321,291 @@ class Volume(Middleware):
                 return
         #
         await channel.send(f"Player volume is set to {player.volume}")
+
+
+class Queue(Middleware):
+    """Middleware for showing the playlist or adding audio's url to it.
+
+    Attributes:
+        PAGE_SIZE: Number of entries to show.
+    """
+
+    PAGE_SIZE = 10
+
+    async def run(
+        self,
+        *_,
+        ctx: Context,
+        next: Callable,
+        url: Optional[str] = None,
+        extractor: str = "youtube-dl",
+        **kw,
+    ):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        if url:
+            playlist = await _extract(channel, state, player, extractor, url)
+            if playlist is None:
+                return
+            #
+            count = len(playlist.entries)
+            more = "" if playlist.is_complete() else " (and more to load)"
+            player.enqueue(playlist)
+            await channel.send(f"Added {count} entries to the queue{more}.")
+            return
+        #
+        entries = player.playlist.entries
+        if len(entries) == 0:
+            await channel.send("Queue is empty.")
+            return
+        #
+        start = 0 if player.is_stopped() else player.position
+        lines = []
+
+        for index, entry in enumerate(
+            itertools.islice(entries.iter_from(start), self.PAGE_SIZE), start
+        ):
+            marker = "> " if index == start and not player.is_stopped() else ""
+            lines.append(f"{marker}{index + 1}. {entry.title}")
+        #
+        rest = len(entries) - start - len(lines)
+        if rest > 0:
+            lines.append(f"And {rest} more.")
+        await channel.send("\n".join(lines))
+
+
+class Remove(Middleware):
+    """Middleware for removing an entry from the playlist."""
+
+    async def run(
+        self,
+        *_,
+        ctx: Context,
+        next: Callable,
+        index: Optional[str] = None,
+        **kw,
+    ):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        index = _parse_index(index, player)
+        if index is None:
+            await channel.send("No such entry in the queue.")
+            return
+        #
+        entry = player.remove(index)
+        await channel.send(f"Removed {entry.title}.")
+
+
+class Move(Middleware):
+    """Middleware for moving an entry within the playlist."""
+
+    async def run(
+        self,
+        *_,
+        ctx: Context,
+        next: Callable,
+        source: Optional[str] = None,
+        target: Optional[str] = None,
+        **kw,
+    ):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        source = _parse_index(source, player)
+        target = _parse_index(target, player)
+        if source is None or target is None:
+            await channel.send("No such entry in the queue.")
+            return
+        #
+        player.move(source, target)
+        await channel.send("Moved.")
+
+
+class Shuffle(Middleware):
+    """Middleware for shuffling not played yet entries of the playlist."""
+
+    async def run(self, *_, ctx: Context, next: Callable, **kw):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        player.shuffle()
+        await channel.send("Shuffled.")
+
+
+class Jump(Middleware):
+    """Middleware for switching playback to an entry of the playlist."""
+
+    async def run(
+        self,
+        *_,
+        ctx: Context,
+        next: Callable,
+        index: Optional[str] = None,
+        **kw,
+    ):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        if audio_state.voice_client is None:
+            await channel.send("I'm not connected to voice channel.")
+            return
+        #
+        index = _parse_index(index, player)
+        if index is None:
+            await channel.send("No such entry in the queue.")
+            return
+        #
+        player.jump(index)
+        await channel.send(f"Playing {player.playlist.entries[index].title}.")
+
+
+class Autoplay(Middleware):
+    """Middleware for switching autoplay of related audio, when the playlist
+    is over.
+
+    Seed playlist's url can be provided to play from it, if there's no related
+    audio.
+    """
+
+    async def run(
+        self,
+        *_,
+        ctx: Context,
+        next: Callable,
+        mode: Optional[str] = None,
+        url: Optional[str] = None,
+        extractor: str = "youtube-dl",
+        **kw,
+    ):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        if mode is None:
+            enabled = "enabled" if player.autoplay is not None else "disabled"
+            await channel.send(f"Autoplay is {enabled}.")
+            return
+        if mode.lower() == "off":
+            player.autoplay = None
+            await channel.send("Autoplay is disabled.")
+            return
+        if mode.lower() != "on":
+            await channel.send("Only `on` and `off` values are possible.")
+            return
+        #
+        seed = None
+        if url:
+            seed = await _extract(channel, state, player, extractor, url)
+            if seed is None:
+                return
+        #
+        player.autoplay = AutoplayBuffer(seed=seed)
+        await channel.send("Autoplay is enabled.")
+
+
+def _format_span(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value * 1000:.0f} ms"
+
+
+def _format_stream(stream_format: Optional[Dict]) -> str:
+    if stream_format is None:
+        return ""
+    #
+    parts = [str(stream_format["format_id"]), str(stream_format["acodec"])]
+    if stream_format["abr"] is not None:
+        parts.append(f"{stream_format['abr']:g} kbps")
+    if stream_format["asr"] is not None:
+        parts.append(f"{stream_format['asr']} Hz")
+    return ", " + " ".join(parts)
+
+
+class Stats(Middleware):
+    """Middleware for showing playback timelines of the latest tracks.
+
+    Attributes:
+        PAGE_SIZE: Number of tracks to show.
+    """
+
+    PAGE_SIZE = 5
+
+    async def run(self, *_, ctx: Context, next: Callable, **kw):  # noqa: D102
+        state = MiddlewareState.get_state(ctx, State)
+        astate = MiddlewareState.get_state(ctx, audio.State)
+
+        if state is None or astate is None:
+            return
+
+        channel = ctx.kwargs["message"].channel
+
+        audio_state = astate.get_audio_state(channel.guild)
+        player = state.get_player(audio_state)
+
+        timelines = player.stats()[-self.PAGE_SIZE :]
+        if not timelines:
+            await channel.send("Nothing has been played yet.")
+            return
+        #
+        lines = []
+        for timeline in reversed(timelines):
+            cached = ", cached" if timeline["cached"] else ""
+            lines.append(
+                f"{timeline['title'] or 'Unknown'} ({timeline['reason']}"
+                f"{cached}{_format_stream(timeline['format'])}): "
+                f"gap {_format_span(timeline['gap'])}, "
+                f"resolve {_format_span(timeline['resolve'])}, "
+                f"startup {_format_span(timeline['startup'])}, "
+                f"{timeline['frames']} frames, "
+                f"{timeline['underruns']} underruns, "
+                f"{timeline['late_frames']} late frames "
+                f"(max interval {_format_span(timeline['max_interval'])})"
+            )
+        await channel.send("\n".join(lines))
@@ -22,48 +22,165 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import asyncio
+import collections
 import enum
-from typing import Optional
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import discord
 
 from concord.ext.audio import AudioExtensionError, AudioState, AudioStatus
 
-from concord.ext.player.entry import Playlist
-from concord.ext.player.exceptions import PlayerError
+from concord.ext.player.autoplay import AutoplayBuffer
+from concord.ext.player.buffer import BufferPool
+from concord.ext.player.cache import AudioCache
+from concord.ext.player.entry import Entry, Playlist
+from concord.ext.player.exceptions import (
+    CircuitOpenError,
+    ExtractionCancelledError,
+    PlayerError,
+    PlayerExtensionError,
+)
+from concord.ext.player.extractor import Extractor
+from concord.ext.player.formats import FormatPolicy
+from concord.ext.player.loudness import LoudnessAnalyzer
+from concord.ext.player.source import PlayerAudioSource
+from concord.ext.player.stats import TrackTimeline
+
+
+log = logging.getLogger(__name__)
 
 
 class PlayerStatus(enum.Enum):
+    LOADING = enum.auto()
     PLAYING = enum.auto()
     PAUSED = enum.auto()
     STOPPED = enum.auto()
 
 
+class PlayerSnapshot(NamedTuple):
+    """Read-only summary of a player.
+
+    Attributes:
+        status: Status of the player.
+        position: Index of the current entry in the playlist.
+        queue_length: Number of loaded entries in the playlist.
+        volume: Volume of audio.
+        title: Title of the current entry, or ``None`` if player is stopped.
+        idle: Time since the last activity (command or status change), in
+            seconds.
+    """
+
+    status: PlayerStatus
+    position: int
+    queue_length: int
+    volume: float
+    title: Optional[str]
+    idle: float
+
+
 class Player:
+    """Audio player of a guild.
+
+    Player is a state machine, owned by the event loop. Commands (play, skip,
+    stop, etc) are not applied immediately, but put into the internal queue and
+    applied one by one on the event loop, so commands from the audio thread
+    (end of the audio) can't interleave with them. Preparation of the audio
+    (resolving and spawning FFmpeg) is done by a single tracked task, that is
+    cancelled on any command, that changes current audio.
+
+    Attributes:
+        MAX_RESUMES: Maximum number of attempts to continue playback of a track,
+            that has ended early.
+        EARLY_EOF_TOLERANCE: Difference in seconds between played time and
+            track's duration, after which the track is considered as ended
+            early.
+        AUTOPLAY_DISTANCE: Number of not played entries, after which autoplay
+            buffer should be refilled.
+        STATS_SIZE: Number of the latest track timelines to keep.
+    """
+
+    MAX_RESUMES = 3
+    EARLY_EOF_TOLERANCE = 5.0
+    AUTOPLAY_DISTANCE = 1
+    STATS_SIZE = 20
+
+    TRANSITIONS = {
+        PlayerStatus.STOPPED: {PlayerStatus.LOADING, PlayerStatus.STOPPED},
+        PlayerStatus.LOADING: {
+            PlayerStatus.LOADING,
+            PlayerStatus.PLAYING,
+            PlayerStatus.PAUSED,
+            PlayerStatus.STOPPED,
+        },
+        PlayerStatus.PLAYING: {
+            PlayerStatus.LOADING,
+            PlayerStatus.PAUSED,
+            PlayerStatus.STOPPED,
+        },
+        PlayerStatus.PAUSED: {
+            PlayerStatus.LOADING,
+            PlayerStatus.PAUSED,
+            PlayerStatus.STOPPED,
+        },
+    }
+
     def __init__(
-        self, audio_state: AudioState, *, playlist: Optional[Playlist] = None
+        self,
+        audio_state: AudioState,
+        *,
+        playlist: Optional[Playlist] = None,
+        cache: Optional[AudioCache] = None,
+        loudness: Optional[LoudnessAnalyzer] = None,
+        resolver: Optional[Extractor] = None,
+        buffer: Optional[BufferPool] = None,
+        format_policy: Optional[FormatPolicy] = None,
     ):
         self._audio_state = audio_state
         self._loop = asyncio.get_running_loop()
+        self._cache = cache
+        self._loudness = loudness
+        self._resolver = resolver
+        self._buffer = buffer
+        self._format_policy = format_policy
 
         self._playlist = playlist or Playlist()
         self._audio_source = None
+        self._extract_task = None
+        self._extractions = set()
+        self._play_task = None
+        self._stream = None
+        self._offset = 0.0
+        self._resumes = 0
+        self._gain = 1.0
+
+        self._commands = collections.deque()
+        self._is_scheduled = False
+        self._last_activity = time.monotonic()
 
         self._status = PlayerStatus.STOPPED
         self._playlist_pos = 0
 
         self._volume = 1.0
+        self._autoplay = None
+
+        self._timeline = None
+        self._timelines = collections.deque(maxlen=self.STATS_SIZE)
 
     def set_playlist(self, playlist: Playlist):
-        self._playlist = playlist
-        self._playlist_pos = 0
+        self._submit(self._set_playlist, playlist)
 
     @property
     def playlist(self):
         return self._playlist
 
+    @property
+    def status(self) -> PlayerStatus:
+        return self._status
+
     def is_playing(self):
-        return self._status == PlayerStatus.PLAYING
+        return self._status in (PlayerStatus.LOADING, PlayerStatus.PLAYING)
 
     def is_paused(self):
         return self._status == PlayerStatus.PAUSED
@@ -71,77 +188,538 @@ class Player:
     def is_stopped(self):
         return self._status == PlayerStatus.STOPPED
 
-    async def _play(self):
-        if self._audio_source is None:
-            entry = self._playlist.entries[self._playlist_pos]
-            url = await entry.resolve(self._loop)
-            self._audio_source = discord.PCMVolumeTransformer(
-                discord.FFmpegPCMAudio(url), volume=self.volume
+    def is_extracting(self):
+        return bool(self._extractions)
+
+    async def extract(
+        self, extractor: Extractor, url: str, *, replace: bool = False
+    ) -> Playlist:
+        """Extracts a playlist by given url with given extractor.
+
+        All extractions in progress will be cancelled, if player is stopped.
+
+        Args:
+            extractor: Extractor to extract the playlist with.
+            url: Url of the playlist.
+            replace: Is the playlist going to replace the current one. If so,
+                another replacing extraction in progress will be cancelled,
+                other extractions are not affected.
+
+        Raises:
+            ExtractionCancelledError: If extraction has been cancelled.
+        """
+        task = self._loop.create_task(extractor.extract(url))
+        if replace:
+            self._cancel_extraction()
+            self._extract_task = task
+        self._extractions.add(task)
+
+        try:
+            await asyncio.wait((task,))
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self._extractions.discard(task)
+            if self._extract_task is task:
+                self._extract_task = None
+        #
+        if task.cancelled():
+            raise ExtractionCancelledError()
+        return task.result()
+
+    def _cancel_extraction(self):
+        if self._extract_task is not None:
+            self._extract_task.cancel()
+            self._extract_task = None
+
+    def _cancel_extractions(self):
+        for task in self._extractions:
+            task.cancel()
+        self._extract_task = None
+
+    def _submit(self, command: Callable, *args):
+        """Puts the command into the queue.
+
+        Should be called on the event loop's thread.
+        """
+        self._commands.append((command, args))
+        self._last_activity = time.monotonic()
+        if not self._is_scheduled:
+            self._is_scheduled = True
+            self._loop.call_soon(self._process_commands)
+
+    def _process_commands(self):
+        self._is_scheduled = False
+        while self._commands:
+            command, args = self._commands.popleft()
+            try:
+                command(*args)
+            except Exception:
+                # One broken command shouldn't stall the rest of the queue.
+                log.exception("Failed to apply player command")
+
+    def _transition(self, status: PlayerStatus):
+        if status not in self.TRANSITIONS[self._status]:
+            raise PlayerError(
+                f"Transition {self._status.name} -> {status.name} is invalid"
             )
+        self._status = status
+        self._last_activity = time.monotonic()
+
+    def _start(self, reason: str):
+        """Starts preparation and playback of the current entry.
+
+        Args:
+            reason: What has caused the start, recorded to the timeline.
+        """
+        self._cancel_play()
+        self._transition(PlayerStatus.LOADING)
+        if self._timeline is not None:
+            self._timeline.end()
+        self._timeline = TrackTimeline(reason)
+        self._timelines.append(self._timeline)
+        self._play_task = self._loop.create_task(self._play())
 
+    def _cancel_play(self):
+        if self._play_task is not None:
+            self._play_task.cancel()
+            self._play_task = None
+
+    async def _play(self):
+        # Errors are handled here directly: the task is cancelled by any
+        # command, that changes current audio, so the result is never stale.
+        try:
+            if self._audio_source is None:
+                await self._prepare()
+        except asyncio.CancelledError:
+            raise
+        except PlayerError:
+            self._play_task = None
+            self._stop()
+            return
+        except CircuitOpenError:
+            # Upstream is failing, other entries will fail too.
+            self._play_task = None
+            self._transition(PlayerStatus.PAUSED)
+            return
+        except PlayerExtensionError:
+            # Entry can't be played, go to the next one.
+            self._play_task = None
+            self._skip("error")
+            return
+        except Exception:
+            # Something is broken (e.g. FFmpeg is missing), don't get stuck.
+            log.exception("Failed to prepare audio")
+            self._play_task = None
+            self._stop()
+            return
+        #
+        self._play_task = None
+        self._playlist.prefetch(self._playlist_pos)
+        self._audio_source.timeline = self._timeline
+        if self._timeline.title is None:
+            entry = self._playlist.entries[self._playlist_pos]
+            self._timeline.title = entry.title
         try:
             self._audio_state.add_source(
                 self._audio_source, finalizer=self._on_end_playing_listener
             )
-            self._status = PlayerStatus.PLAYING
+            self._transition(PlayerStatus.PLAYING)
         except AudioExtensionError:
-            self.stop()
-            raise PlayerError()
+            self._stop()
+            return
+        # Restarts of the same entry are not new plays.
+        if self._autoplay is not None and self._timeline.reason not in (
+            "resume",
+            "reconnect",
+        ):
+            self._refill_autoplay()
+
+    def _refill_autoplay(self):
+        entry = self._playlist.entries[self._playlist_pos]
+        self._autoplay.played(entry)
+        # Refill in advance, so the next entry is ready, when playlist is over.
+        rest = len(self._playlist.entries) - self._playlist_pos - 1
+        if rest <= self.AUTOPLAY_DISTANCE and self._playlist.is_complete():
+            self._autoplay.refill(entry)
+
+    async def _prepare(self):
+        await self._playlist.ensure(self._playlist_pos)
+        if self._playlist_pos >= len(self._playlist.entries):
+            raise PlayerError("Playlist is over")
+        #
+        entry = self._playlist.entries[self._playlist_pos]
+        self._timeline.title = entry.title
+        if self._stream is None:
+            self._stream = await self._open(entry)
+            self._gain = self._get_gain(entry)
+        #
+        location, before_options = self._stream
+        if self._offset:
+            before_options = f"-ss {self._offset:.2f} {before_options}"
+        original = discord.FFmpegPCMAudio(
+            location, before_options=before_options.strip() or None
+        )
+        if self._buffer is not None:
+            original = self._buffer.wrap(original)
+        self._audio_source = PlayerAudioSource(
+            original, volume=self._volume * self._gain, offset=self._offset
+        )
+        self._timeline.spawned_at = time.monotonic()
+
+    def _get_gain(self, entry: Entry) -> float:
+        """Returns loudness normalization gain of the entry.
+
+        If the entry isn't analyzed yet, analysis is started in background and
+        the gain is applied on later plays of the entry, as changing volume of
+        the playing track would be audible.
+        """
+        key = entry.key if self._loudness is not None else None
+        if key is None:
+            return 1.0
+        #
+        gain = self._loudness.gain(key)
+        if gain is None:
+            location, before_options = self._stream
+            self._loop.create_task(
+                self._loudness.analyze(
+                    key, location, before_options=before_options
+                )
+            )
+            return 1.0
+        return gain
+
+    async def _open(self, entry: Entry) -> Tuple[str, str]:
+        """Returns location of the entry's audio and FFmpeg input options."""
+        key = entry.key if self._cache is not None else None
+        if key is not None:
+            filename = self._cache.get(key)
+            if filename is not None:
+                self._timeline.cached = True
+                return filename, ""
+        #
+        self._timeline.resolve_started_at = time.monotonic()
+        if self._resolver is not None:
+            url = await self._resolver.resolve(
+                entry, policy=self._format_policy
+            )
+        else:
+            url = await entry.resolve(policy=self._format_policy)
+        self._timeline.resolve_ended_at = time.monotonic()
+        self._timeline.stream_format = entry.stream_format
+        before_options = entry.ffmpeg_before_options()
+        if key is not None and self._cache.count_play(key):
+            self._loop.create_task(
+                self._cache.store(key, url, before_options=before_options)
+            )
+        return url, before_options
 
     def play(self):
-        self._loop.create_task(self._play())
+        self._submit(self._play_command)
 
     def skip(self):
+        self._submit(self._skip, "skip")
+
+    def pause(self):
+        self._submit(self._pause)
+
+    def resume(self):
+        self._submit(self._resume)
+
+    def stop(self):
+        self._cancel_extractions()
+        self._submit(self._stop)
+
+    def _set_playlist(self, playlist: Playlist):
+        self._playlist = playlist
+        self._playlist_pos = 0
+
+    def _play_command(self):
+        if self.is_playing():
+            return
+        if self._is_over():
+            self._stop()
+        else:
+            self._start("play")
+
+    def _skip(self, reason: str):
         if self.is_stopped():
             return
         #
         self._playlist_pos += 1
+        self._restart(reason)
 
-        if self._playlist_pos >= len(self._playlist.entries):
-            self.stop()
+    def _restart(self, reason: str):
+        """Switches playback to the entry at the current position."""
+        if self._is_over():
+            self._stop()
         else:
-            if self._audio_source is not None:
-                try:
-                    self._audio_state.remove_source(self._audio_source)
-                except KeyError:
-                    pass
-            self._audio_source = None
+            self._drop_source()
             if not self.is_paused():
-                self.play()
+                self._start(reason)
 
-    def pause(self):
-        if self.is_playing():
-            self._audio_state.remove_source(self._audio_source)
-            self._status = PlayerStatus.PAUSED
+    def _is_over(self) -> bool:
+        """Checks, if there's nothing to play at the current position.
 
-    def resume(self):
+        If autoplay is enabled, the playlist is extended with its entry.
+        """
+        if self._playlist_pos < len(self._playlist.entries):
+            return False
+        if not self._playlist.is_complete():
+            return False
+        #
+        entry = self._autoplay.pop() if self._autoplay is not None else None
+        if entry is None:
+            return True
+        self._playlist.entries.append(entry)
+        return False
+
+    def _pause(self):
+        if self._status == PlayerStatus.LOADING:
+            self._cancel_play()
+            self._transition(PlayerStatus.PAUSED)
+        elif self._status == PlayerStatus.PLAYING:
+            # Source can be already removed, if its end is not handled yet.
+            try:
+                self._audio_state.remove_source(self._audio_source)
+            except KeyError:
+                pass
+            self._transition(PlayerStatus.PAUSED)
+        if self._timeline is not None:
+            self._timeline.end()
+
+    def _resume(self):
         if self.is_paused():
-            self.play()
+            self._start("resume")
 
-    def stop(self):
+    def _stop(self):
+        self._cancel_play()
+        self._drop_source()
+        self._playlist_pos = 0
+        self._transition(PlayerStatus.STOPPED)
+
+    def _drop_source(self):
+        self._cancel_play()
+        if self._timeline is not None:
+            self._timeline.end()
         if self._audio_source is not None:
             try:
                 self._audio_state.remove_source(self._audio_source)
             except KeyError:
                 pass
-        #
+            self._audio_source.cleanup()
         self._audio_source = None
-        self._playlist_pos = 0
-        self._status = PlayerStatus.STOPPED
+        self._stream = None
+        self._offset = 0.0
+        self._resumes = 0
+
+    @property
+    def position(self) -> int:
+        """Index of the current entry in the playlist."""
+        return self._playlist_pos
+
+    def enqueue(self, playlist: Playlist):
+        """Moves entries of given playlist to the end of the playlist."""
+        self._submit(self._enqueue, playlist)
+
+    def insert(self, index: int, entry: Entry):
+        """Inserts an entry before given index of the playlist."""
+        self._submit(self._insert, index, entry)
+
+    def remove(self, index: int) -> Entry:
+        """Removes an entry by given index from the playlist.
+
+        If the current entry is removed, playback switches to the next one.
+
+        Returns:
+            The entry to be removed.
+        """
+        if not 0 <= index < len(self._playlist.entries):
+            raise IndexError("playlist index out of range")
+        entry = self._playlist.entries[index]
+        self._submit(self._remove, index)
+        return entry
+
+    def move(self, source: int, destination: int):
+        """Moves an entry of the playlist from one index to another."""
+        length = len(self._playlist.entries)
+        if not (0 <= source < length and 0 <= destination < length):
+            raise IndexError("playlist index out of range")
+        self._submit(self._move, source, destination)
+
+    def shuffle(self):
+        """Shuffles entries of the playlist, that are not played yet."""
+        self._submit(self._shuffle)
+
+    def _enqueue(self, playlist: Playlist):
+        self._playlist.extend(playlist)
+
+    def _insert(self, index: int, entry: Entry):
+        self._playlist.entries.insert(index, entry)
+        if index <= self._playlist_pos and not self.is_stopped():
+            self._playlist_pos += 1
+
+    def _remove(self, index: int):
+        if index >= len(self._playlist.entries):
+            return
+        #
+        self._playlist.entries.pop(index)
+        if self.is_stopped():
+            return
+        if index < self._playlist_pos:
+            self._playlist_pos -= 1
+        elif index == self._playlist_pos:
+            self._restart("remove")
+
+    def _move(self, source: int, destination: int):
+        length = len(self._playlist.entries)
+        if source >= length or destination >= length:
+            return
+        #
+        self._playlist.entries.move(source, destination)
+
+        pos = self._playlist_pos
+        if self.is_stopped():
+            return
+        if source == pos:
+            self._playlist_pos = destination
+        elif source < pos <= destination:
+            self._playlist_pos -= 1
+        elif destination <= pos < source:
+            self._playlist_pos += 1
+
+    def _shuffle(self):
+        start = 0 if self.is_stopped() else self._playlist_pos + 1
+        self._playlist.entries.shuffle(start)
+
+    def jump(self, index: int):
+        """Switches playback to an entry by given index of the playlist."""
+        if not 0 <= index < len(self._playlist.entries):
+            raise IndexError("playlist index out of range")
+        self._submit(self._jump, index)
+
+    def _jump(self, index: int):
+        if index >= len(self._playlist.entries):
+            return
+        #
+        self._playlist_pos = index
+        self._drop_source()
+        if not self.is_paused():
+            self._start("jump")
 
     def _on_end_playing_listener(self, audio_source, reason):
-        # If listener is called due to external change in player state, don't do
-        # anything.
-        if reason == AudioStatus.SOURCE_ENDED:
-            self.skip()
+        # Listener can be called from the audio thread, so the event is passed
+        # to the event loop.
+        self._loop.call_soon_threadsafe(
+            self._submit, self._end, audio_source, reason
+        )
+
+    def _end(self, audio_source: PlayerAudioSource, reason: AudioStatus):
+        # If listener is called due to external change in player state, or the
+        # audio is not current anymore, don't do anything.
+        if reason != AudioStatus.SOURCE_ENDED:
+            return
+        if audio_source is not self._audio_source:
+            return
+        #
+        if self._ended_early(audio_source):
+            self._resume_at(audio_source)
+        else:
+            self._skip("end")
+
+    def _ended_early(self, audio_source: PlayerAudioSource) -> bool:
+        """Checks, if the audio has ended before the track's end.
+
+        It happens, when an upstream fails and FFmpeg gives up reconnecting.
+        """
+        duration = self._playlist.entries[self._playlist_pos].duration
+        return (
+            duration is not None
+            and self._resumes < self.MAX_RESUMES
+            and audio_source.elapsed + self.EARLY_EOF_TOLERANCE < duration
+        )
+
+    def _resume_at(self, audio_source: PlayerAudioSource):
+        """Continues playback of the current entry from where it has ended."""
+        self._resumes += 1
+        # Nothing has been played, stream url is probably expired.
+        if audio_source.frames == 0:
+            self._stream = None
+        self._offset = audio_source.elapsed
+        self._audio_source = None
+        audio_source.cleanup()
+        self._start("reconnect")
+
+    def snapshot(self, now: Optional[float] = None) -> PlayerSnapshot:
+        """Returns read-only summary of the player.
+
+        Args:
+            now: Current :func:`time.monotonic` value, to compute idle time
+                with.
+        """
+        if now is None:
+            now = time.monotonic()
+        entries = self._playlist.entries
+        title = None
+        if not self.is_stopped() and self._playlist_pos < len(entries):
+            title = entries[self._playlist_pos].title
+        #
+        return PlayerSnapshot(
+            status=self._status,
+            position=self._playlist_pos,
+            queue_length=len(entries),
+            volume=self._volume,
+            title=title,
+            idle=now - self._last_activity,
+        )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Returns timelines of the latest tracks, oldest first.
+
+        See :meth:`TrackTimeline.as_dict` for the format.
+        """
+        return [timeline.as_dict() for timeline in self._timelines]
+
+    @property
+    def autoplay(self) -> Optional[AutoplayBuffer]:
+        """Autoplay buffer, if autoplay is enabled."""
+        return self._autoplay
+
+    @autoplay.setter
+    def autoplay(self, value: Optional[AutoplayBuffer]):
+        if self._autoplay is not None:
+            self._autoplay.close()
+        self._autoplay = value
+        if value is None or self.is_stopped():
+            return
+        if self._playlist_pos < len(self._playlist.entries):
+            self._refill_autoplay()
+
+    @property
+    def format_policy(self) -> Optional[FormatPolicy]:
+        """Format policy for resolving entries, or ``None`` to use extractors'
+        defaults.
+
+        Applied to entries resolved after the change.
+        """
+        return self._format_policy
+
+    @format_policy.setter
+    def format_policy(self, value: Optional[FormatPolicy]):
+        self._format_policy = value
 
     @property
     def volume(self) -> float:
-        """Volume of audio (float number from 0.0 to 2.0)."""
+        """Volume of audio (float number from 0.0 to 2.0).
+
+        Loudness normalization gain of the current entry is applied on top of
+        it.
+        """
         return self._volume
 
     @volume.setter
     def volume(self, value):
         self._volume = max(min(value, 2.0), 0.0)
         if self._audio_source is not None:
-            self._audio_source.volume = self._volume
+            self._audio_source.volume = self._volume * self._gain
@@ -0,0 +1,91 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+from typing import Optional
+
+import discord
+
+from concord.ext.player.buffer import BufferedAudioSource
+from concord.ext.player.stats import TrackTimeline
+
+
+class PlayerAudioSource(discord.PCMVolumeTransformer):
+    """Volume transformer, that keeps track of played time.
+
+    If the original audio is buffered, silence played due to empty buffer is
+    not counted as played time.
+
+    Args:
+        original: The original audio source.
+        volume: Initial volume.
+        offset: Position of the original audio's start in the track, in
+            seconds.
+
+    Attributes:
+        offset: Position of the original audio's start in the track, in
+            seconds.
+        frames: Number of frames read from the original audio.
+        timeline: Timeline to record frame reads to.
+    """
+
+    FRAME_LENGTH = 0.02
+
+    def __init__(
+        self,
+        original: discord.AudioSource,
+        *,
+        volume: float = 1.0,
+        offset: float = 0.0,
+    ):
+        super().__init__(original, volume=volume)
+        self.offset = offset
+        self.frames = 0
+        self.timeline: Optional[TrackTimeline] = None
+        self._buffer = (
+            original if isinstance(original, BufferedAudioSource) else None
+        )
+        self._underruns = 0
+
+    @property
+    def elapsed(self) -> float:
+        """Position of playback in the track, in seconds."""
+        return self.offset + self.frames * self.FRAME_LENGTH
+
+    def read(self) -> bytes:  # noqa: D102
+        started_at = time.monotonic()
+        data = super().read()
+        buffer = self._buffer
+        if buffer is not None and buffer.silent:
+            if buffer.underruns != self._underruns:
+                self._underruns = buffer.underruns
+                if self.timeline is not None:
+                    self.timeline.underrun()
+            return data
+        #
+        if data:
+            self.frames += 1
+            timeline = self.timeline
+            if timeline is not None:
+                timeline.frame(started_at, time.monotonic())
+        return data
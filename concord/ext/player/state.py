@@ -21,16 +21,22 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Optional, Sequence, Type
+import time
+from typing import Dict, Optional, Sequence, Type
 
 from concord.ext.audio import AudioState
 
+from concord.ext.player.buffer import BufferPool
+from concord.ext.player.cache import AudioCache
 from concord.ext.player.extractor import (
     Extractor,
+    ExtractorChain,
     StreamlinkExtractor,
     YouTubeDLExtractor,
 )
-from concord.ext.player.player import Player
+from concord.ext.player.formats import FormatPolicy
+from concord.ext.player.loudness import LoudnessAnalyzer
+from concord.ext.player.player import Player, PlayerSnapshot
 
 
 class State:
@@ -40,15 +46,46 @@ class State:
 
     Args:
         extractors: Extractors to initialize.
+        cache: Disk cache of transcoded audio, shared by all players.
+        loudness: Loudness analyzer for normalization, shared by all players.
+        chain: Mode of the extractor chain (see :class:`ExtractorChain`), or
+            ``None`` to disable it. If enabled, the chain of all extractors is
+            available as ``"auto"`` extractor, and players resolve entries with
+            it, falling back to other extractors.
+        hedge_delay: Delay in seconds before starting the next extractor in
+            the chain's ``"race"`` mode.
+        buffer: Memory budget for read-ahead buffers, shared by all players.
+        format_policy: Default format policy of players, or ``None`` to use
+            extractors' defaults. Can be changed per player.
 
     Attributes:
         players: Map guild.id -> guild player object with current playlist,
             custom options and other info, related for that guild.
         extractors: Initialized extractors (with aliases).
+        cache: Disk cache of transcoded audio, if enabled.
+        loudness: Loudness analyzer for normalization, if enabled.
+        chain: Extractor chain, if enabled.
+        buffer: Memory budget for read-ahead buffers, if enabled.
+        format_policy: Default format policy of players.
     """
 
-    def __init__(self, extractors: Optional[Sequence[Type[Extractor]]] = None):
+    def __init__(
+        self,
+        extractors: Optional[Sequence[Type[Extractor]]] = None,
+        *,
+        cache: Optional[AudioCache] = None,
+        loudness: Optional[LoudnessAnalyzer] = None,
+        chain: Optional[str] = None,
+        hedge_delay: float = ExtractorChain.HEDGE_DELAY,
+        buffer: Optional[BufferPool] = None,
+        format_policy: Optional[FormatPolicy] = None,
+    ):
         self.extractors = {}
+        self.cache = cache
+        self.loudness = loudness
+        self.chain = None
+        self.buffer = buffer
+        self.format_policy = format_policy
         self._players = {}
 
         if extractors is None:
@@ -59,6 +96,14 @@ class State:
 
             for alias in extractor.ALIASES:
                 self.extractors[alias] = instance
+        #
+        if chain is not None:
+            instances = list(dict.fromkeys(self.extractors.values()))
+            self.chain = ExtractorChain(
+                instances, mode=chain, hedge_delay=hedge_delay
+            )
+            for alias in ExtractorChain.ALIASES:
+                self.extractors[alias] = self.chain
 
     def get_player(self, audio_state: AudioState) -> Player:
         """Returns player for given audio state.
@@ -73,6 +118,36 @@ class State:
         """
         player = self._players.get(audio_state)
         if player is None:
-            player = self._players[audio_state] = Player(audio_state)
+            player = self._players[audio_state] = Player(
+                audio_state,
+                cache=self.cache,
+                loudness=self.loudness,
+                resolver=self.chain,
+                buffer=self.buffer,
+                format_policy=self.format_policy,
+            )
 
         return player
+
+    def find_player(self, audio_state: AudioState) -> Optional[Player]:
+        """Returns player for given audio state, if it is created.
+
+        Unlike :meth:`get_player`, player is never created.
+        """
+        return self._players.get(audio_state)
+
+    def snapshot(self) -> Dict[AudioState, PlayerSnapshot]:
+        """Returns read-only summaries of all created players.
+
+        Players are not created, so it is safe to be polled for every guild.
+
+        Returns:
+            Map audio state -> summary of its player.
+        """
+        now = time.monotonic()
+        # Players can be created during iteration, if called from another
+        # thread.
+        return {
+            audio_state: player.snapshot(now)
+            for audio_state, player in list(self._players.items())
+        }
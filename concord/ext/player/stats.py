@@ -0,0 +1,156 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class TrackTimeline:
+    """Timeline of a track's playback.
+
+    Records moments of a track transition: request (skip, end of the previous
+    track, etc), resolve start and end, FFmpeg spawn and the first frame
+    delivered to the audio state. During playback, it counts frames, read
+    underruns and late frames.
+
+    Times are :func:`time.monotonic` values, ``None`` if the moment hasn't
+    happened.
+
+    Args:
+        reason: What has caused the transition.
+        title: Title of the track.
+
+    Attributes:
+        FRAME_LENGTH: Duration of a frame, in seconds.
+        LATE_THRESHOLD: Interval between frame reads, after which the frame is
+            considered as late, in seconds.
+        reason: What has caused the transition.
+        title: Title of the track.
+        cached: Is the track played from the cache.
+        stream_format: Chosen format of the resolved stream (format_id,
+            acodec, abr, asr), if known.
+        requested_at: Time of the request.
+        resolve_started_at: Time of the resolve start.
+        resolve_ended_at: Time of the resolve end.
+        spawned_at: Time of FFmpeg spawn.
+        first_frame_at: Time of the first frame delivery.
+        ended_at: Time of playback end.
+        frames: Number of delivered frames.
+        underruns: Number of frame reads, that took longer than a frame or
+            returned silence due to empty buffer.
+        late_frames: Number of frames read too late after the previous one.
+        max_interval: Maximum interval between frame reads, in seconds.
+    """
+
+    __slots__ = (
+        "reason",
+        "title",
+        "cached",
+        "stream_format",
+        "requested_at",
+        "resolve_started_at",
+        "resolve_ended_at",
+        "spawned_at",
+        "first_frame_at",
+        "ended_at",
+        "frames",
+        "underruns",
+        "late_frames",
+        "max_interval",
+        "_last_read_at",
+    )
+
+    FRAME_LENGTH = 0.02
+    LATE_THRESHOLD = 0.04
+
+    def __init__(self, reason: str, title: Optional[str] = None):
+        self.reason = reason
+        self.title = title
+        self.cached = False
+        self.stream_format = None
+        self.requested_at = time.monotonic()
+        self.resolve_started_at = None
+        self.resolve_ended_at = None
+        self.spawned_at = None
+        self.first_frame_at = None
+        self.ended_at = None
+        self.frames = 0
+        self.underruns = 0
+        self.late_frames = 0
+        self.max_interval = 0.0
+        self._last_read_at = None
+
+    def frame(self, started_at: float, ended_at: float):
+        """Records a frame read.
+
+        Called from the audio thread.
+        """
+        if self.first_frame_at is None:
+            self.first_frame_at = ended_at
+        elif self._last_read_at is not None:
+            interval = started_at - self._last_read_at
+            if interval > self.LATE_THRESHOLD:
+                self.late_frames += 1
+            if interval > self.max_interval:
+                self.max_interval = interval
+        #
+        if ended_at - started_at > self.FRAME_LENGTH:
+            self.underruns += 1
+        self._last_read_at = started_at
+        self.frames += 1
+
+    def underrun(self):
+        """Records a frame of silence, played due to empty buffer.
+
+        Called from the audio thread.
+        """
+        self.underruns += 1
+
+    def end(self):
+        if self.ended_at is None:
+            self.ended_at = time.monotonic()
+
+    @staticmethod
+    def _span(start: Optional[float], end: Optional[float]) -> Optional[float]:
+        if start is None or end is None:
+            return None
+        return end - start
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the timeline with computed durations, in seconds."""
+        return {
+            "reason": self.reason,
+            "title": self.title,
+            "cached": self.cached,
+            "format": self.stream_format,
+            "gap": self._span(self.requested_at, self.first_frame_at),
+            "resolve": self._span(
+                self.resolve_started_at, self.resolve_ended_at
+            ),
+            "startup": self._span(self.spawned_at, self.first_frame_at),
+            "played": self._span(self.first_frame_at, self.ended_at),
+            "frames": self.frames,
+            "underruns": self.underruns,
+            "late_frames": self.late_frames,
+            "max_interval": self.max_interval,
+        }
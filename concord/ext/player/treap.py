@@ -0,0 +1,211 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017-2018 Nariman Safiulin
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import random
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("value", "priority", "size", "left", "right")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node) -> _Node:
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+
+def _split(
+    node: Optional[_Node], index: int
+) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Splits the tree into the first ``index`` items and the rest."""
+    if node is None:
+        return None, None
+    #
+    if _size(node.left) < index:
+        node.right, right = _split(node.right, index - _size(node.left) - 1)
+        return _update(node), right
+    left, node.left = _split(node.left, index)
+    return left, _update(node)
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    #
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+class EntryQueue:
+    """Sequence with cheap manipulation by index.
+
+    It is an implicit treap (randomized binary search tree keyed by position),
+    so access, insertion, removal and moving of items by index are done in
+    O(log n), length is known in O(1).
+
+    Items can be stored lazily as ``(factory, *args)`` tuples. Such item is
+    replaced by ``factory(*args)`` result on first access.
+
+    Args:
+        items: Items to fill the queue with.
+    """
+
+    def __init__(self, items: Optional[Iterable] = None):
+        self._root = None
+
+        if items is not None:
+            for item in items:
+                self.append(item)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __bool__(self) -> bool:
+        return self._root is not None
+
+    def __iter__(self) -> Iterator:
+        return self.iter_from(0)
+
+    def _normalize(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("queue index out of range")
+        return index
+
+    def _find(self, index: int) -> _Node:
+        node = self._root
+        index = self._normalize(index)
+
+        while True:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index > left:
+                index -= left + 1
+                node = node.right
+            else:
+                return node
+
+    @staticmethod
+    def _value(node: _Node) -> Any:
+        if type(node.value) is tuple:
+            factory, *args = node.value
+            node.value = factory(*args)
+        return node.value
+
+    def __getitem__(self, index: int) -> Any:
+        return self._value(self._find(index))
+
+    def __setitem__(self, index: int, value: Any):
+        self._find(index).value = value
+
+    def iter_from(self, index: int) -> Iterator:
+        """Iterates over items, starting from given index."""
+        stack = []
+        node = self._root
+
+        # Descend to the item by index, keeping the path with unvisited items.
+        while node is not None:
+            left = _size(node.left)
+            if index <= left:
+                stack.append(node)
+                node = node.left
+            else:
+                index -= left + 1
+                node = node.right
+        #
+        while stack:
+            node = stack.pop()
+            yield self._value(node)
+
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def append(self, value: Any):
+        """Appends an item to the end of the queue."""
+        self._root = _merge(self._root, _Node(value))
+
+    def extend(self, other: "EntryQueue"):
+        """Moves all items of other queue to the end of the queue."""
+        self._root = _merge(self._root, other._root)
+        other._root = None
+
+    def insert(self, index: int, value: Any):
+        """Inserts an item before given index."""
+        length = len(self)
+        if index < 0:
+            index = max(index + length, 0)
+        index = min(index, length)
+
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, _Node(value)), right)
+
+    def pop(self, index: int = -1) -> Any:
+        """Removes an item by given index and returns it."""
+        index = self._normalize(index)
+
+        left, right = _split(self._root, index)
+        node, right = _split(right, 1)
+        self._root = _merge(left, right)
+        return self._value(node)
+
+    def move(self, source: int, destination: int):
+        """Moves an item from one index to another."""
+        destination = self._normalize(destination)
+        self.insert(destination, self.pop(source))
+
+    def shuffle(self, start: int = 0):
+        """Shuffles items in place, starting from given index.
+
+        Items are swapped in place (Fisher-Yates shuffle), no copy of the
+        queue is made.
+        """
+        for i in range(len(self) - 1, start, -1):
+            j = random.randint(start, i)
+            if i != j:
+                a, b = self._find(i), self._find(j)
+                a.value, b.value = b.value, a.value
+
+    def clear(self):
+        """Removes all items from the queue."""
+        self._root = None
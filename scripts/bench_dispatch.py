@@ -0,0 +1,118 @@
+# Measures per-message overhead of the extension's middleware dispatching.
+# Compares one filter chain per subcommand (as it was before) with a single
+# shared filter chain and table-driven subcommand dispatch.
+# Should be started from the project root.
+
+import asyncio
+import time
+from unittest import mock
+
+import discord
+
+from concord.constants import EventType
+from concord.context import Context
+from concord.ext.base import (
+    BotFilter,
+    ChannelTypeFilter,
+    Command,
+    EventNormalization,
+    EventTypeFilter,
+)
+from concord.middleware import MiddlewareState, chain_of, sequence_of
+
+from concord.ext.player.middleware import Subcommands
+
+COMMANDS = [
+    ("play", "(?P<url>.+)?"),
+    ("pause", None),
+    ("resume", None),
+    ("stop", None),
+    ("skip", None),
+    ("volume", "(?P<volume>.+)?"),
+    ("queue", "(?P<url>.+)?"),
+    ("remove", "(?P<index>.+)?"),
+    ("move", r"(?P<source>\S+)?\s*(?P<target>\S+)?"),
+    ("shuffle", None),
+    ("jump", "(?P<index>.+)?"),
+]
+MESSAGES = {
+    "non-player": "hello there, how are you doing?",
+    "player (first)": "player play https://example.com/",
+    "player (last)": "player jump 3",
+}
+ITERATIONS = 20000
+
+
+async def handler(*args, ctx, next, **kwargs):
+    pass
+
+
+def before():
+    return sequence_of(
+        [
+            chain_of(
+                [
+                    handler,
+                    MiddlewareState(object()),
+                    Command(name, rest_pattern=rest),
+                    Command("player"),
+                    ChannelTypeFilter(guild=True),
+                    BotFilter(authored_by_bot=False),
+                    EventTypeFilter(EventType.MESSAGE),
+                    EventNormalization(),
+                ]
+            )
+            for name, rest in COMMANDS
+        ]
+    )
+
+
+def after():
+    return sequence_of(
+        [
+            chain_of(
+                [
+                    Subcommands(
+                        {
+                            name: chain_of(
+                                [handler, Command(name, rest_pattern=rest)]
+                            )
+                            for name, rest in COMMANDS
+                        }
+                    ),
+                    MiddlewareState(object()),
+                    Command("player"),
+                    ChannelTypeFilter(guild=True),
+                    BotFilter(authored_by_bot=False),
+                    EventTypeFilter(EventType.MESSAGE),
+                    EventNormalization(),
+                ]
+            )
+        ]
+    )
+
+
+async def measure(middleware, content):
+    message = mock.Mock(content=content)
+    message.author.bot = False
+    message.channel = mock.Mock(spec=discord.TextChannel)
+
+    async def next(*args, ctx, **kwargs):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        ctx = Context(None, EventType.MESSAGE, message)
+        await middleware.run(ctx=ctx, next=next)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main():
+    for name, content in MESSAGES.items():
+        old = await measure(before(), content)
+        new = await measure(after(), content)
+        print(f"{name:>16}: {old:8.2f} us -> {new:8.2f} us per message")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())